@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from app.models.schemas import UserCreate, UserLogin
 from app.api.deps import get_user_service
 from app.services.user_service import UserService
@@ -6,11 +6,14 @@ from app.services.user_service import UserService
 router = APIRouter(tags=["auth"])
 
 @router.post("/users/")
-def create_user(user: UserCreate, service: UserService = Depends(get_user_service)):
-    data = service.create_user(user)
+async def create_user(user: UserCreate, service: UserService = Depends(get_user_service)):
+    data = await service.create_user(user)
     return {"message": "User created", "data": data}
 
 @router.post("/login/")
-def login_user(payload: UserLogin, service: UserService = Depends(get_user_service)):
-    token = service.login(payload)
+async def login_user(payload: UserLogin, request: Request, service: UserService = Depends(get_user_service)):
+    # behind a reverse proxy this is the proxy's address unless uvicorn runs
+    # with --proxy-headers and --forwarded-allow-ips (see README)
+    client_ip = request.client.host if request.client else "unknown"
+    token = await service.login(payload, client_ip)
     return {"access_token": token, "token_type": "bearer"}
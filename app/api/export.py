@@ -0,0 +1,31 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_export_service
+from app.core.security import get_current_user_id
+from app.services.export_service import ExportService
+
+router = APIRouter(tags=["export"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def assert_owner(current_user_id: int, user_id: int):
+    if current_user_id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+@router.get("/users/{user_id}/export")
+async def export_user_data(
+    user_id: int,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    service: ExportService = Depends(get_export_service),
+    current_user_id: int = Depends(get_current_user_id),
+):
+    assert_owner(current_user_id, user_id)
+    stream = service.csv(user_id) if format == "csv" else service.ndjson(user_id)
+    return StreamingResponse(
+        stream,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="wasteless-export-{user_id}.{format}"'},
+    )
@@ -1,7 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
 
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+
+from app.core.config import FOOD_PAGE_DEFAULT_LIMIT, FOOD_PAGE_MAX_LIMIT, POSTGREST_MAX_ROWS
+from app.core.responses import ORJSONResponse
 from app.core.security import get_current_user_id
-from app.models.schemas import FoodItemCreate, FoodItemConsume
+from app.models.schemas import (
+    BulkFoodItemsSaved,
+    FoodItemConsume,
+    FoodItemCreate,
+    FoodItemList,
+    FoodItemPage,
+    FoodItemSaved,
+)
 from app.api.deps import get_food_service
 from app.services.food_service import FoodService
 
@@ -11,73 +22,100 @@ def assert_owner(current_user_id: int, user_id: int):
     if current_user_id != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-@router.post("/users/{user_id}/food")
-def add_food_item(
+@router.post("/users/{user_id}/food", response_model=FoodItemSaved)
+async def add_food_item(
     user_id: int,
     item: FoodItemCreate,
     service: FoodService = Depends(get_food_service),
     current_user_id: int = Depends(get_current_user_id),
 ):
     assert_owner(current_user_id, user_id)
-    status, data = service.add_or_update_food_item(user_id, item)
-    return {"message": f"Item {status}", "data": data}
+    status, data = await service.add_or_update_food_item(user_id, item)
+    return ORJSONResponse({"message": f"Item {status}", "data": data})
 
-@router.get("/users/{user_id}/food")
-def list_food_items(
+@router.post("/users/{user_id}/food/bulk", response_model=BulkFoodItemsSaved)
+async def bulk_add_food_items(
     user_id: int,
+    # the upsert returns at most max-rows lots
+    items: List[FoodItemCreate] = Body(..., max_length=POSTGREST_MAX_ROWS),
     service: FoodService = Depends(get_food_service),
     current_user_id: int = Depends(get_current_user_id),
 ):
     assert_owner(current_user_id, user_id)
-    items = service.list_food_items(user_id)
-    return {"items": items}
+    results = await service.bulk_add_food_items(user_id, items)
+    return ORJSONResponse({"message": f"{len(results)} items processed", "items": results})
 
-@router.get("/users/{user_id}/food/{item_id}")
-def food_item_detail(
+@router.get("/users/{user_id}/food", response_model=FoodItemPage)
+async def list_food_items(
     user_id: int,
-    item_id: int,
+    limit: int = Query(FOOD_PAGE_DEFAULT_LIMIT, ge=1, le=FOOD_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    unit: Optional[str] = None,
     service: FoodService = Depends(get_food_service),
     current_user_id: int = Depends(get_current_user_id),
 ):
     assert_owner(current_user_id, user_id)
-    return service.get_food_item(user_id, item_id)
+    return ORJSONResponse(await service.list_food_items(
+        user_id, limit=limit, cursor=cursor, fields=fields, name_prefix=name_prefix, unit=unit
+    ))
 
-@router.post("/users/{user_id}/food/{item_id}/consume")
-def consume_item(
+@router.get("/users/{user_id}/food/expiring", response_model=FoodItemList)
+async def expiring_items(
+    user_id: int,
+    days: int = Query(5, ge=0),
+    service: FoodService = Depends(get_food_service),
+    current_user_id: int = Depends(get_current_user_id),
+):
+    assert_owner(current_user_id, user_id)
+    return ORJSONResponse(await service.get_expiring_items(user_id, days))
+
+@router.get("/users/{user_id}/food/expiring/digest")
+async def expiry_digest(
+    user_id: int,
+    service: FoodService = Depends(get_food_service),
+    current_user_id: int = Depends(get_current_user_id),
+):
+    assert_owner(current_user_id, user_id)
+    return service.get_expiry_digest(user_id)
+
+@router.get("/users/{user_id}/food/{item_id}")
+async def food_item_detail(
     user_id: int,
     item_id: int,
-    body: FoodItemConsume,
     service: FoodService = Depends(get_food_service),
     current_user_id: int = Depends(get_current_user_id),
 ):
     assert_owner(current_user_id, user_id)
-    return service.consume_item(user_id, item_id, body)
+    return await service.get_food_item(user_id, item_id)
 
-@router.delete("/users/{user_id}/food/{item_id}")
-def delete_item(
+@router.post("/users/{user_id}/food/{item_id}/consume")
+async def consume_item(
     user_id: int,
     item_id: int,
+    body: FoodItemConsume,
     service: FoodService = Depends(get_food_service),
     current_user_id: int = Depends(get_current_user_id),
 ):
     assert_owner(current_user_id, user_id)
-    return service.delete_item(user_id, item_id)
+    return await service.consume_item(user_id, item_id, body)
 
-@router.delete("/users/{user_id}/food")
-def delete_user_food(
+@router.delete("/users/{user_id}/food/{item_id}")
+async def delete_item(
     user_id: int,
+    item_id: int,
     service: FoodService = Depends(get_food_service),
     current_user_id: int = Depends(get_current_user_id),
 ):
     assert_owner(current_user_id, user_id)
-    return service.delete_all_food(user_id)
+    return await service.delete_item(user_id, item_id)
 
-@router.get("/users/{user_id}/food/expiring")
-def expiring_items(
+@router.delete("/users/{user_id}/food")
+async def delete_user_food(
     user_id: int,
-    days: int = 5,
     service: FoodService = Depends(get_food_service),
     current_user_id: int = Depends(get_current_user_id),
 ):
     assert_owner(current_user_id, user_id)
-    return service.get_expiring_items(user_id, days)
+    return await service.delete_all_food(user_id)
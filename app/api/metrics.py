@@ -0,0 +1,35 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import render_prometheus
+from app.core.rate_limit import login_throttle
+from app.core.security import password_hasher, token_cache
+from app.db.supabase import pool_stats
+from app.services.expiry_sweeper import expiry_sweeper
+from app.services.recipe_service import suggestion_cache
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@router.get("/metrics/cache")
+async def cache_stats():
+    return {"suggestions": suggestion_cache.stats(), "jwt": token_cache.stats()}
+
+@router.get("/metrics/password-hashing")
+async def password_hashing_stats():
+    return password_hasher.stats()
+
+@router.get("/metrics/expiry-sweeper")
+async def expiry_sweeper_stats():
+    return expiry_sweeper.stats()
+
+@router.get("/metrics/db-pool")
+async def db_pool_stats():
+    return pool_stats()
+
+@router.get("/metrics/login-throttle")
+async def login_throttle_stats():
+    return login_throttle.stats()
@@ -1,8 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import logging
+from typing import List, Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from app.api.deps import get_recipe_service
+from app.core.responses import ORJSONResponse
 from app.core.security import get_current_user_id
-from app.models.schemas import RecipeCreate
-from app.services.recipe_service import RecipeService
+from app.models.schemas import (
+    RecipeCreate,
+    RecipeImportFailed,
+    RecipeImportProgress,
+    RecipeImportResult,
+    RecipeSaved,
+    RecipeSuggestions,
+    ShoppingList,
+    ShoppingListRequest,
+)
+from app.services.recipe_service import RecipeImportError, RecipeService
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["recipes"])
 
@@ -10,21 +28,73 @@ def assert_owner(current_user_id: int, user_id: int):
     if current_user_id != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-@router.get("/users/{user_id}/recipes/suggest")
-def suggest_recipes(
+@router.get("/users/{user_id}/recipes/suggest", response_model=RecipeSuggestions)
+async def suggest_recipes(
     user_id: int,
+    limit: Optional[int] = Query(None, ge=1),
     service: RecipeService = Depends(get_recipe_service),
     current_user_id: int = Depends(get_current_user_id),
 ):
     assert_owner(current_user_id, user_id)
-    return service.compute_recipe_suggestions(user_id)
+    return ORJSONResponse(await service.compute_recipe_suggestions(user_id, limit))
 
-@router.post("/users/{user_id}/recipes")
-def save_recipe(
+@router.post("/users/{user_id}/recipes", response_model=RecipeSaved)
+async def save_recipe(
     user_id: int,
     payload: RecipeCreate,
     service: RecipeService = Depends(get_recipe_service),
     current_user_id: int = Depends(get_current_user_id),
 ):
     assert_owner(current_user_id, user_id)
-    return service.save_recipe(user_id, payload)
+    return ORJSONResponse(await service.save_recipe(user_id, payload))
+
+@router.post(
+    "/users/{user_id}/recipes/bulk",
+    response_model=RecipeImportResult,
+    responses={
+        200: {"content": {"application/x-ndjson": {"schema": RecipeImportProgress.model_json_schema()}}},
+        500: {"model": RecipeImportFailed},
+    },
+)
+async def import_recipes(
+    user_id: int,
+    payloads: List[RecipeCreate],
+    progress: bool = False,
+    service: RecipeService = Depends(get_recipe_service),
+    current_user_id: int = Depends(get_current_user_id),
+):
+    assert_owner(current_user_id, user_id)
+    # progress=true streams one NDJSON line per chunk, for very large imports;
+    # a failed chunk ends the stream with a RecipeImportFailed line
+    if progress:
+        queue = service.import_recipes_detached(user_id, payloads)
+
+        async def lines():
+            try:
+                while (line := await queue.get()) is not None:
+                    yield orjson.dumps(line) + b"\n"
+            except asyncio.CancelledError:
+                logger.info("Client left the recipe import of user %s, it continues in the background", user_id)
+                raise
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    recipe_ids = []
+    try:
+        async for chunk in service.import_recipes(user_id, payloads):
+            recipe_ids.extend(chunk["recipe_ids"])
+    except RecipeImportError as exc:
+        return ORJSONResponse(
+            {"error": str(exc), "imported": exc.imported, "total": exc.total, "recipe_ids": exc.recipe_ids},
+            status_code=500,
+        )
+    return ORJSONResponse({"message": f"{len(recipe_ids)} recipes imported", "recipe_ids": recipe_ids})
+
+@router.post("/users/{user_id}/shopping-list", response_model=ShoppingList)
+async def shopping_list(
+    user_id: int,
+    payload: ShoppingListRequest,
+    service: RecipeService = Depends(get_recipe_service),
+    current_user_id: int = Depends(get_current_user_id),
+):
+    assert_owner(current_user_id, user_id)
+    return ORJSONResponse(await service.shopping_list(user_id, payload.recipe_ids))
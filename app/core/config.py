@@ -1,14 +1,136 @@
+import logging
 import os
-from dotenv import load_dotenv
+from dataclasses import dataclass
+from typing import Optional, Set
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise RuntimeError("Please set SUPABASE_URL and SUPABASE_KEY in your environment or .env file")
+@dataclass(frozen=True)
+class Settings:
+    """
+    Where and how to reach the database, plus the secrets. Read from the
+    environment and ``.env`` by load_settings() in the app lifespan, so
+    importing the app does no file I/O and never fails on a missing .env.
+    """
+
+    # "memory" runs the app against the in-process stand-in in app/db/memory.py
+    supabase_backend: str = "supabase"
+    supabase_url: Optional[str] = None
+    supabase_key: Optional[str] = None
+    # shared HTTP pool for all Supabase calls; HTTP/2 needs the optional h2 package
+    pool_max_connections: int = 100
+    pool_max_keepalive: int = 20
+    keepalive_expiry_seconds: float = 30
+    timeout_seconds: float = 10
+    connect_timeout_seconds: float = 5
+    pool_timeout_seconds: float = 5
+    http2: bool = True
+    jwt_secret: str = "change-me"
+    expiry_sweeper_enabled: bool = True
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        env = os.environ
+        return cls(
+            supabase_backend=env.get("SUPABASE_BACKEND", "supabase"),
+            supabase_url=env.get("SUPABASE_URL"),
+            supabase_key=env.get("SUPABASE_KEY"),
+            pool_max_connections=int(env.get("SUPABASE_POOL_MAX_CONNECTIONS", "100")),
+            pool_max_keepalive=int(env.get("SUPABASE_POOL_MAX_KEEPALIVE", "20")),
+            keepalive_expiry_seconds=float(env.get("SUPABASE_KEEPALIVE_EXPIRY_SECONDS", "30")),
+            timeout_seconds=float(env.get("SUPABASE_TIMEOUT_SECONDS", "10")),
+            connect_timeout_seconds=float(env.get("SUPABASE_CONNECT_TIMEOUT_SECONDS", "5")),
+            pool_timeout_seconds=float(env.get("SUPABASE_POOL_TIMEOUT_SECONDS", "5")),
+            http2=env.get("SUPABASE_HTTP2", "1") == "1",
+            jwt_secret=env.get("JWT_SECRET", "change-me"),
+            expiry_sweeper_enabled=env.get("EXPIRY_SWEEPER_ENABLED", "1") == "1",
+        )
+
+
+_settings: Optional[Settings] = None
+
+
+def load_settings() -> Settings:
+    """Reads ``.env`` and the environment; called on every app startup."""
+    global _settings
+    from dotenv import dotenv_values, load_dotenv
+
+    late = sorted(name for name in dotenv_values() if name in _TUNING and name not in os.environ)
+    if late:
+        logger.warning(
+            "%s from .env ignored: tuning settings are read at import, "
+            "pass them in the process environment (e.g. uvicorn --env-file .env)",
+            ", ".join(late),
+        )
+    load_dotenv()
+    _settings = Settings.from_env()
+    return _settings
+
+
+def get_settings() -> Settings:
+    """The settings of the running app; scripts outside the app load them on first use."""
+    return _settings if _settings is not None else load_settings()
+
+
+def validate_settings(settings: Settings):
+    if settings.supabase_backend != "memory" and (not settings.supabase_url or not settings.supabase_key):
+        raise RuntimeError("Please set SUPABASE_URL and SUPABASE_KEY in your environment or .env file")
+
+
+# Tuning settings size module-level objects and route validators, so they
+# are read from the process environment when this module is imported.
+_TUNING: Set[str] = set()
+
+
+def _tuning(name: str, default: str) -> str:
+    _TUNING.add(name)
+    return os.environ.get(name, default)
+
+
+# PostgREST's db-max-rows: a select never returns more rows than this,
+# whatever limit it asked for, so full reads are paged at this size
+POSTGREST_MAX_ROWS = int(_tuning("POSTGREST_MAX_ROWS", "1000"))
 
-SECRET_KEY = os.environ.get("JWT_SECRET", "change-me")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+
+INGREDIENT_INDEX_MAX_USERS = int(_tuning("INGREDIENT_INDEX_MAX_USERS", "10000"))
+INGREDIENT_INDEX_TTL_SECONDS = int(_tuning("INGREDIENT_INDEX_TTL_SECONDS", "300"))
+
+EXPIRY_INDEX_MAX_USERS = int(_tuning("EXPIRY_INDEX_MAX_USERS", "10000"))
+EXPIRY_INDEX_TTL_SECONDS = int(_tuning("EXPIRY_INDEX_TTL_SECONDS", "300"))
+
+SUGGESTION_CACHE_SIZE = int(_tuning("SUGGESTION_CACHE_SIZE", "10000"))
+SUGGESTION_CACHE_TTL_SECONDS = int(_tuning("SUGGESTION_CACHE_TTL_SECONDS", "60"))
+
+BCRYPT_ROUNDS = int(_tuning("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(_tuning("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(_tuning("PASSWORD_HASH_MAX_PENDING", "64"))
+
+# login attempts per minute and burst, per username and per client IP
+LOGIN_RATE_PER_MINUTE = float(_tuning("LOGIN_RATE_PER_MINUTE", "5"))
+LOGIN_BURST = int(_tuning("LOGIN_BURST", "10"))
+LOGIN_IP_RATE_PER_MINUTE = float(_tuning("LOGIN_IP_RATE_PER_MINUTE", "30"))
+LOGIN_IP_BURST = int(_tuning("LOGIN_IP_BURST", "60"))
+LOGIN_THROTTLE_MAX_BUCKETS = int(_tuning("LOGIN_THROTTLE_MAX_BUCKETS", "100000"))
+
+# 0 disables the verified-token cache
+JWT_CACHE_SIZE = int(_tuning("JWT_CACHE_SIZE", "10000"))
+
+FOOD_PAGE_DEFAULT_LIMIT = int(_tuning("FOOD_PAGE_DEFAULT_LIMIT", "100"))
+# a page reads limit + 1 rows to know whether there is a next one, and that
+# read has to fit under max-rows
+FOOD_PAGE_MAX_LIMIT = min(int(_tuning("FOOD_PAGE_MAX_LIMIT", "999")), POSTGREST_MAX_ROWS - 1)
+
+# a larger export page would come back short and end the export early
+EXPORT_PAGE_SIZE = min(int(_tuning("EXPORT_PAGE_SIZE", "500")), POSTGREST_MAX_ROWS)
+
+# recipes per batch of the bulk import; each batch is one import_recipes call,
+# whose result rows have to fit under max-rows
+RECIPE_IMPORT_CHUNK_SIZE = min(int(_tuning("RECIPE_IMPORT_CHUNK_SIZE", "500")), POSTGREST_MAX_ROWS)
+
+EXPIRY_WARNING_DAYS = int(_tuning("EXPIRY_WARNING_DAYS", "5"))
+# clamped to POSTGREST_MAX_ROWS by the sweeper
+EXPIRY_SCAN_PAGE_SIZE = int(_tuning("EXPIRY_SCAN_PAGE_SIZE", "1000"))
+EXPIRY_RESCAN_SECONDS = int(_tuning("EXPIRY_RESCAN_SECONDS", "3600"))
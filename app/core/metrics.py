@@ -0,0 +1,142 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+POOL_IN_FLIGHT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class RequestDbStats:
+    """PostgREST calls made on behalf of the current request."""
+
+    __slots__ = ("round_trips", "seconds")
+
+    def __init__(self):
+        self.round_trips = 0
+        self.seconds = 0.0
+
+
+# set by MetricsMiddleware for the duration of a request
+current_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("current_db_stats", default=None)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram, one series per label tuple."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            if position < len(self.buckets):
+                series[position] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, labels))
+            prefix = label_text + "," if label_text else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {values[-1]}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {values[-2]}")
+            lines.append(f"{self.name}_count{{{label_text}}} {values[-1]}")
+        return "\n".join(lines)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency by route.",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+http_request_round_trips = Histogram(
+    "http_request_db_round_trips", "PostgREST calls per request by route.",
+    ("method", "route"), ROUND_TRIP_BUCKETS,
+)
+db_execute_duration = Histogram(
+    "db_execute_duration_seconds", "Duration of each PostgREST call by table or RPC function.",
+    ("target",), LATENCY_BUCKETS,
+)
+db_pool_in_flight = Histogram(
+    "db_pool_in_flight_requests", "Requests already in flight on the Supabase HTTP pool when a new one starts.",
+    (), POOL_IN_FLIGHT_BUCKETS,
+)
+HISTOGRAMS = (http_request_duration, http_request_round_trips, db_execute_duration, db_pool_in_flight)
+
+
+def record_db_call(target: str, seconds: float):
+    db_execute_duration.observe(seconds, target)
+    stats = current_db_stats.get()
+    if stats is not None:
+        stats.round_trips += 1
+        stats.seconds += seconds
+
+
+def render_prometheus() -> str:
+    return "\n".join(h.render() for h in HISTOGRAMS) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request into ``http_request_duration_seconds`` labelled
+    with the matched route template, and counts the PostgREST calls it made.
+    Calls made before the response starts are reported in the
+    ``X-DB-Round-Trips`` and ``Server-Timing`` headers; calls made while a
+    streaming body is sent only show up in the histograms.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDbStats()
+        token = current_db_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_headers(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-round-trips", str(stats.round_trips).encode()),
+                    (b"server-timing", f"db;dur={stats.seconds * 1000:.3f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_db_stats.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_request_duration.observe(time.perf_counter() - start, scope["method"], route, str(status))
+            http_request_round_trips.observe(stats.round_trips, scope["method"], route)
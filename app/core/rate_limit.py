@@ -0,0 +1,140 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, List
+
+from fastapi import HTTPException
+
+from app.core.cache import LRUCache
+from app.core.config import (
+    LOGIN_BURST,
+    LOGIN_IP_BURST,
+    LOGIN_IP_RATE_PER_MINUTE,
+    LOGIN_RATE_PER_MINUTE,
+    LOGIN_THROTTLE_MAX_BUCKETS,
+)
+from app.core.security import PasswordHasher, password_hasher
+
+
+class TokenBuckets:
+    """
+    One token bucket per key, holding up to ``burst`` tokens and refilled at
+    ``rate`` tokens per second. Buckets are kept in LRU order and the least
+    recently used is dropped beyond ``max_buckets``; a dropped bucket comes
+    back full. Not thread-safe on its own.
+    """
+
+    def __init__(self, rate: float, burst: int, max_buckets: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_buckets = max_buckets
+        self.clock = clock
+        self.evictions = 0
+        self._buckets: "OrderedDict[Hashable, List[float]]" = OrderedDict()  # key -> [tokens, updated_at]
+
+    def _bucket(self, key: Hashable) -> List[float]:
+        now = self.clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now]
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def wait_time(self, key: Hashable) -> float:
+        """Seconds until ``key`` has a whole token, 0.0 if it has one now."""
+        tokens = self._bucket(key)[0]
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def take(self, key: Hashable):
+        self._bucket(key)[0] -= 1
+
+    def clear(self):
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class LoginThrottle:
+    """
+    Rate limit for ``POST /login/`` by username and by client IP, checked
+    before the user lookup and the bcrypt check. An attempt needs a token
+    from both buckets and takes them only when both have one. CPU time
+    avoided is estimated from the hasher's average bcrypt check, counting
+    only rejections for usernames an earlier attempt found: an unknown
+    username fails before bcrypt, so rejecting it saves no hashing.
+    """
+
+    def __init__(
+        self,
+        by_user: TokenBuckets,
+        by_ip: TokenBuckets,
+        hasher: PasswordHasher = password_hasher,
+    ):
+        self.by_user = by_user
+        self.by_ip = by_ip
+        self.hasher = hasher
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.rejected_existing = 0
+        # casefolded usernames a login attempt found in the database; a
+        # username's first attempt is always allowed, so it is known before
+        # it can be rejected
+        self._existing = LRUCache(maxsize=by_user.max_buckets)
+
+    def check(self, username: str, client_ip: str):
+        user_key = username.casefold()
+        with self._lock:
+            wait = max(self.by_user.wait_time(user_key), self.by_ip.wait_time(client_ip))
+            if wait > 0:
+                self.rejected += 1
+                if self._existing.get(user_key):
+                    self.rejected_existing += 1
+            else:
+                self.by_user.take(user_key)
+                self.by_ip.take(client_ip)
+                self.allowed += 1
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many login attempts",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    def user_found(self, username: str):
+        self._existing.set(username.casefold(), True)
+
+    def clear(self):
+        with self._lock:
+            self.by_user.clear()
+            self.by_ip.clear()
+            self._existing.clear()
+
+    def stats(self) -> dict:
+        verify_seconds = self.hasher.verify_cpu_seconds()
+        with self._lock:
+            return {
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "rejected_existing_users": self.rejected_existing,
+                "user_buckets": len(self.by_user),
+                "ip_buckets": len(self.by_ip),
+                "max_buckets": self.by_user.max_buckets,
+                "evictions": self.by_user.evictions + self.by_ip.evictions,
+                "bcrypt_verify_cpu_avg_ms": round(verify_seconds * 1000, 3),
+                "cpu_seconds_avoided": round(self.rejected_existing * verify_seconds, 3),
+            }
+
+
+login_throttle = LoginThrottle(
+    TokenBuckets(LOGIN_RATE_PER_MINUTE / 60, LOGIN_BURST, LOGIN_THROTTLE_MAX_BUCKETS),
+    TokenBuckets(LOGIN_IP_RATE_PER_MINUTE / 60, LOGIN_IP_BURST, LOGIN_THROTTLE_MAX_BUCKETS),
+)
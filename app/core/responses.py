@@ -0,0 +1,12 @@
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON rendered with orjson. Dates, datetimes and numpy values are
+    serialised natively, so content does not need ``jsonable_encoder`` first.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
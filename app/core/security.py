@@ -1,3 +1,8 @@
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -6,31 +11,146 @@ from fastapi import HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt, JWTError
 
-from app.core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.config import (
+    ALGORITHM,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+    JWT_CACHE_SIZE,
+    get_settings,
+)
+from app.core.cache import LRUCache
 
 bearer_scheme = HTTPBearer()
 
-def hash_password(plain_password: str) -> str:
-    return bcrypt.hashpw(plain_password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+def hash_password(plain_password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    return bcrypt.hashpw(plain_password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
+def password_needs_rehash(hashed_password: str, rounds: int = BCRYPT_ROUNDS) -> bool:
+    # bcrypt hashes look like $2b$<cost>$<salt+digest>
+    try:
+        return int(hashed_password.split("$")[2]) != rounds
+    except (IndexError, ValueError):
+        return True
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, bounded thread pool so a burst of logins
+    cannot occupy the workers that serve food and recipe requests. At most
+    ``max_pending`` jobs may be queued or running; beyond that callers get
+    a 503 instead of waiting indefinitely.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.verifies = 0
+        self.verify_cpu_total = 0.0
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Too many password operations in progress")
+            self.pending += 1
+        submitted = time.perf_counter()
+
+        def job():
+            wait = time.perf_counter() - submitted
+            with self._lock:
+                self.queue_wait_total += wait
+                self.queue_wait_max = max(self.queue_wait_max, wait)
+            return fn(*args)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    async def hash(self, plain_password: str) -> str:
+        return await self._run(hash_password, plain_password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(self._timed_verify, plain_password, hashed_password)
+
+    def _timed_verify(self, plain_password: str, hashed_password: str) -> bool:
+        start = time.thread_time()
+        try:
+            return verify_password(plain_password, hashed_password)
+        finally:
+            with self._lock:
+                self.verifies += 1
+                self.verify_cpu_total += time.thread_time() - start
+
+    def verify_cpu_seconds(self) -> float:
+        """Average CPU time of one bcrypt check so far, 0.0 before the first."""
+        with self._lock:
+            return self.verify_cpu_total / self.verifies if self.verifies else 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_wait_avg_ms": round(self.queue_wait_total / self.completed * 1000, 3) if self.completed else 0.0,
+                "queue_wait_max_ms": round(self.queue_wait_max * 1000, 3),
+                "verify_cpu_avg_ms": round(self.verify_cpu_total / self.verifies * 1000, 3) if self.verifies else 0.0,
+                "bcrypt_rounds": BCRYPT_ROUNDS,
+            }
+
+
+password_hasher = PasswordHasher()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, get_settings().jwt_secret, algorithm=ALGORITHM)
+
+# sha256(token) -> user_id, for tokens whose signature has already been
+# verified; each entry expires together with its token's exp claim
+token_cache = LRUCache(maxsize=JWT_CACHE_SIZE)
+
+def resolve_user_id(token: str, cache: Optional[LRUCache] = token_cache) -> int:
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    if cache is not None and cache.maxsize:
+        user_id = cache.get(key)
+        if user_id is not None:
+            return user_id
 
-def get_current_user_id(
-    credentials: HTTPAuthorizationCredentials = Security(bearer_scheme),
-) -> int:
-    token = credentials.credentials
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, get_settings().jwt_secret, algorithms=[ALGORITHM])
         user_id: int = payload.get("user_id")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token payload")
-        return user_id
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    exp = payload.get("exp")
+    if cache is not None and cache.maxsize and exp is not None:
+        ttl = float(exp) - time.time()
+        if ttl > 0:
+            cache.set(key, user_id, ttl=ttl)
+    return user_id
+
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Security(bearer_scheme),
+) -> int:
+    return resolve_user_id(credentials.credentials)
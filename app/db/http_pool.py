@@ -0,0 +1,125 @@
+import importlib.util
+import threading
+from typing import Tuple
+
+import httpx
+
+from app.core.metrics import db_pool_in_flight
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body that releases its in-flight slot once it is closed."""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class MonitoredTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps the pooled transport and counts requests in flight, from sending
+    until the response body is closed. A request that starts while
+    ``max_connections`` are already busy has to wait for a free connection
+    (HTTP/1.1) or share one (HTTP/2); those are counted as saturated.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_connections: int, max_keepalive: int, http2: bool):
+        self._transport = transport
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.http2 = http2
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.saturated_requests = 0
+        self.pool_timeouts = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        with self._lock:
+            db_pool_in_flight.observe(self.in_flight)
+            if self.in_flight >= self.max_connections:
+                self.saturated_requests += 1
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException as exc:
+            if isinstance(exc, httpx.PoolTimeout):
+                with self._lock:
+                    self.pool_timeouts += 1
+            self._release()
+            raise
+        response.stream = _TrackedStream(response.stream, self._release)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive,
+                "http2": self.http2,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "requests": self.requests,
+                "saturated_requests": self.saturated_requests,
+                "pool_timeouts": self.pool_timeouts,
+            }
+
+
+def build_http_client(
+    max_connections: int,
+    max_keepalive: int,
+    keepalive_expiry: float,
+    timeout: float,
+    connect_timeout: float,
+    pool_timeout: float,
+    http2: bool = True,
+) -> Tuple[httpx.AsyncClient, MonitoredTransport]:
+    """
+    One shared, pooled ``httpx.AsyncClient`` for every Supabase sub-client,
+    plus the transport that reports its saturation. HTTP/2 is only enabled
+    when the optional ``h2`` package is installed.
+    """
+    http2 = http2 and http2_available()
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=keepalive_expiry,
+    )
+    transport = MonitoredTransport(
+        httpx.AsyncHTTPTransport(limits=limits, http2=http2),
+        max_connections, max_keepalive, http2,
+    )
+    client = httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(timeout, connect=connect_timeout, pool=pool_timeout),
+    )
+    return client, transport
@@ -0,0 +1,56 @@
+import time
+
+from app.core.metrics import record_db_call
+
+
+class InstrumentedQuery:
+    """
+    Wraps a query or RPC builder; chained builder calls stay wrapped and
+    ``execute()`` is timed and counted against ``target``.
+    """
+
+    __slots__ = ("_query", "_target")
+
+    def __init__(self, query, target: str):
+        self._query = query
+        self._target = target
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if hasattr(attr, "execute"):
+            return InstrumentedQuery(attr, self._target)  # e.g. the ``not_`` property
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return InstrumentedQuery(result, self._target) if hasattr(result, "execute") else result
+
+        return call
+
+    async def execute(self):
+        start = time.perf_counter()
+        try:
+            return await self._query.execute()
+        finally:
+            record_db_call(self._target, time.perf_counter() - start)
+
+
+class InstrumentedClient:
+    """Pass-through for the supabase client whose ``table()`` and ``rpc()`` builders are instrumented."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name: str) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.table(name), name)
+
+    def rpc(self, func: str, params: dict) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.rpc(func, params), f"rpc:{func}")
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def instrument(client):
+    return client if isinstance(client, InstrumentedClient) else InstrumentedClient(client)
@@ -0,0 +1,475 @@
+import asyncio
+import itertools
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# child table -> (parent table, foreign key column on the child)
+FOREIGN_KEYS = {
+    "recipe_ingredients": ("recipes", "recipe_id"),
+    "recipes": ("users", "user_id"),
+    "food_stock": ("users", "user_id"),
+}
+
+
+@dataclass
+class InMemoryResponse:
+    data: List[Dict[str, Any]]
+
+
+@lru_cache(maxsize=256)
+def _split_top_level(columns: str) -> Tuple[str, ...]:
+    parts, depth, current = [], 0, ""
+    for ch in columns:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return tuple(parts)
+
+
+def _like_to_regex(pattern: str) -> "re.Pattern":
+    out, i = "", 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < len(pattern):
+            out += re.escape(pattern[i + 1])
+            i += 2
+            continue
+        out += ".*" if ch in "%*" else "." if ch == "_" else re.escape(ch)
+        i += 1
+    return re.compile(out + r"\Z", re.S)
+
+
+def _comparable(value, operand):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return float(value), float(operand)
+        except (TypeError, ValueError):
+            pass
+    return str(value), str(operand)
+
+
+def _compare(value, op: str, operand) -> bool:
+    if op == "is":
+        if str(operand).lower() == "null":
+            return value is None
+        return str(value).lower() == str(operand).lower()
+    if value is None:
+        return False
+    if op == "like":
+        return _like_to_regex(str(operand)).match(str(value)) is not None
+    a, b = _comparable(value, operand)
+    if op == "eq":
+        return a == b
+    if op == "neq":
+        return a != b
+    if op == "gt":
+        return a > b
+    if op == "gte":
+        return a >= b
+    if op == "lt":
+        return a < b
+    if op == "lte":
+        return a <= b
+    raise ValueError(f"Unsupported operator: {op}")
+
+
+def _row_key(value):
+    """Hash-index key of a stored value, matching the way _compare treats it for ``eq``."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return "n", float(value)
+    return "s", str(value)
+
+
+def _operand_keys(operand) -> List[tuple]:
+    keys = [("s", str(operand))]
+    try:
+        keys.append(("n", float(operand)))
+    except (TypeError, ValueError):
+        pass
+    return keys
+
+
+def _parse_condition(condition: str):
+    """Parses one PostgREST logic-tree condition, e.g. ``and(a.eq.1,b.gt.2)``."""
+    for combinator, reducer in (("and(", all), ("or(", any)):
+        if condition.startswith(combinator) and condition.endswith(")"):
+            parts = [_parse_condition(c) for c in _split_top_level(condition[len(combinator):-1])]
+            return lambda row: reducer(part(row) for part in parts)
+    column, op, operand = condition.split(".", 2)
+    return lambda row: _compare(row.get(column), op, operand)
+
+
+class InMemoryQuery:
+    def __init__(self, client: "InMemoryClient", table: str):
+        self.client = client
+        self.table = table
+        self._op = "select"
+        self._columns = "*"
+        self._payload = None
+        self._filters = []
+        self._order = []
+        self._limit: Optional[int] = None
+        self._eq: List[Tuple[str, Any]] = []
+
+    # --- operations ---
+
+    def select(self, *columns: str):
+        self._op = "select"
+        self._columns = ",".join(columns) if columns else "*"
+        return self
+
+    def insert(self, rows):
+        self._op = "insert"
+        self._payload = rows
+        return self
+
+    def update(self, values: dict):
+        self._op = "update"
+        self._payload = values
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    # --- filters / modifiers ---
+
+    def _filter(self, column: str, op: str, value):
+        self._filters.append(lambda row: _compare(row.get(column), op, value))
+        return self
+
+    def eq(self, column: str, value):
+        self._eq.append((column, value))
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value):
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value):
+        return self._filter(column, "lte", value)
+
+    def like(self, column: str, pattern: str):
+        return self._filter(column, "like", pattern)
+
+    def is_(self, column: str, value):
+        return self._filter(column, "is", value)
+
+    def or_(self, filters: str):
+        self._filters.append(_parse_condition(f"or({filters})"))
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int):
+        self._limit = size
+        return self
+
+    # --- execution ---
+
+    def _matches(self, row: dict) -> bool:
+        return all(pred(row) for pred in self._filters)
+
+    def _candidates(self) -> List[dict]:
+        """Rows to test against the filters: the smallest hash-index bucket of any ``eq`` filter."""
+        if not self._eq:
+            return self.client.tables[self.table]
+        column, value = min(self._eq, key=lambda f: self.client.bucket_size(self.table, *f))
+        return self.client.lookup(self.table, column, value)
+
+    def _project(self, row: dict, columns: str) -> dict:
+        out = {}
+        for col in _split_top_level(columns):
+            if "(" in col:
+                child, inner = col[:-1].split("(", 1)
+                child = child.strip()
+                _, fk = FOREIGN_KEYS[child]
+                out[child] = [self._project(r, inner) for r in self.client.lookup(child, fk, row.get("id"))]
+            elif col == "*":
+                out.update(row)
+            else:
+                out[col] = row.get(col)
+        return out
+
+    async def execute(self) -> InMemoryResponse:
+        self.client.round_trips += 1
+        if self.client.latency:
+            await asyncio.sleep(self.client.latency)
+        return self._run()
+
+    def _run(self) -> InMemoryResponse:
+        if self._op == "insert":
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            inserted = []
+            for values in payload:
+                row = dict(values)
+                row.setdefault("id", self.client.next_id(self.table))
+                self.client.add_row(self.table, row)
+                inserted.append(dict(row))
+            return InMemoryResponse(inserted)
+
+        matched = [row for row in self._candidates() if self._matches(row)]
+
+        if self._op == "update":
+            for row in matched:
+                self.client.update_row(self.table, row, self._payload)
+            return InMemoryResponse([dict(row) for row in matched])
+
+        if self._op == "delete":
+            self.client.remove_rows(self.table, matched)
+            return InMemoryResponse([dict(row) for row in matched])
+
+        for column, desc in reversed(self._order):
+            matched.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        if self._limit is not None:
+            matched = matched[: self._limit]
+        if self.client.max_rows is not None:
+            matched = matched[: self.client.max_rows]
+        return InMemoryResponse([self._project(row, self._columns) for row in matched])
+
+
+class InMemoryRPC:
+    def __init__(self, client: "InMemoryClient", func: str, params: dict):
+        self.client = client
+        self.func = func
+        self.params = params
+
+    async def execute(self) -> InMemoryResponse:
+        self.client.round_trips += 1
+        if self.client.latency:
+            await asyncio.sleep(self.client.latency)
+        return InMemoryResponse(RPC_FUNCTIONS[self.func](self.client, **self.params))
+
+
+def _lot_key(row: dict) -> tuple:
+    return row["name_norm"], row["unit"], str(row["expiration_date"])
+
+
+def _upsert_food_items(client: "InMemoryClient", p_user_id: int, p_items: List[dict]) -> List[dict]:
+    by_lot = {_lot_key(r): r for r in client.lookup("food_stock", "user_id", p_user_id)}
+    result = []
+    for item in p_items:
+        row = by_lot.get(_lot_key(item))
+        created = row is None
+        if created:
+            row = {"id": client.next_id("food_stock"), "user_id": p_user_id, **item}
+            client.add_row("food_stock", row)
+            by_lot[_lot_key(row)] = row
+        else:
+            client.update_row("food_stock", row, {"quantity": float(row["quantity"]) + float(item["quantity"])})
+        result.append({**row, "created": created})
+    return result
+
+
+def _consume_food_item(client: "InMemoryClient", p_user_id: int, p_item_id: int, p_quantity: float) -> List[dict]:
+    for row in client.lookup("food_stock", "id", p_item_id):
+        if row["user_id"] == p_user_id:
+            client.update_row("food_stock", row, {"quantity": float(row["quantity"]) - float(p_quantity)})
+            removed = row["quantity"] <= 0
+            if removed:
+                client.remove_rows("food_stock", [row])
+            return [{**row, "removed": removed}]
+    return []
+
+
+def _set_food_name_norms(client: "InMemoryClient", p_rows: List[dict]) -> List[dict]:
+    updated = merged = 0
+    for change in p_rows:
+        rows = client.lookup("food_stock", "id", change["id"])
+        if not rows:
+            continue
+        row = rows[0]
+        target = next(
+            (
+                r for r in client.lookup("food_stock", "user_id", row["user_id"])
+                if r is not row and _lot_key(r) == (change["name_norm"], row["unit"], str(row["expiration_date"]))
+            ),
+            None,
+        )
+        if target is not None:
+            # the unique lot key would be violated: fold this lot into the existing one
+            client.update_row("food_stock", target, {"quantity": float(target["quantity"]) + float(row["quantity"])})
+            client.remove_rows("food_stock", [row])
+            merged += 1
+        else:
+            client.update_row("food_stock", row, {"name_norm": change["name_norm"]})
+            updated += 1
+    return [{"updated": updated, "merged": merged}]
+
+
+def _set_ingredient_name_norms(client: "InMemoryClient", p_rows: List[dict]) -> List[dict]:
+    updated = 0
+    for change in p_rows:
+        for row in client.lookup("recipe_ingredients", "id", change["id"]):
+            client.update_row("recipe_ingredients", row, {"name_norm": change["name_norm"]})
+            updated += 1
+    return [{"updated": updated, "merged": 0}]
+
+
+def _recipe_rows(
+    client: "InMemoryClient", p_user_id: int, title: str, description: str, ingredients: List[dict]
+) -> Tuple[dict, List[dict]]:
+    recipe = {"id": client.next_id("recipes"), "user_id": p_user_id, "title": title, "description": description}
+    return recipe, [
+        {"id": client.next_id("recipe_ingredients"), "recipe_id": recipe["id"], **ing}
+        for ing in ingredients
+    ]
+
+
+def _store_recipes(client: "InMemoryClient", built: List[Tuple[dict, List[dict]]]) -> List[dict]:
+    # rows are only stored once all of them were built, like the transaction
+    for recipe, ingredients in built:
+        client.add_row("recipes", recipe)
+        for row in ingredients:
+            client.add_row("recipe_ingredients", row)
+    return [{**recipe, "ingredients": [dict(row) for row in ingredients]} for recipe, ingredients in built]
+
+
+def _save_recipe(
+    client: "InMemoryClient", p_user_id: int, p_title: str, p_description: str, p_ingredients: List[dict]
+) -> List[dict]:
+    return _store_recipes(client, [_recipe_rows(client, p_user_id, p_title, p_description, p_ingredients)])
+
+
+def _import_recipes(client: "InMemoryClient", p_user_id: int, p_recipes: List[dict]) -> List[dict]:
+    return _store_recipes(client, [
+        _recipe_rows(client, p_user_id, r["title"], r["description"], r["ingredients"]) for r in p_recipes
+    ])
+
+
+# Python versions of the Postgres functions documented in the README
+RPC_FUNCTIONS = {
+    "upsert_food_items": _upsert_food_items,
+    "consume_food_item": _consume_food_item,
+    "set_food_name_norms": _set_food_name_norms,
+    "set_ingredient_name_norms": _set_ingredient_name_norms,
+    "save_recipe": _save_recipe,
+    "import_recipes": _import_recipes,
+}
+
+
+class InMemoryClient:
+    """
+    Stand-in for the supabase ``AsyncClient`` covering the query builder
+    calls made in ``app/repositories`` and the RPC functions documented in
+    the README. ``latency`` is awaited once per ``execute()`` to simulate a
+    PostgREST round trip.
+
+    Every column used in an ``eq`` filter or as an embedding foreign key gets
+    a hash index on first use, kept up to date by all writes, so lookups by
+    id, user_id or recipe_id do not scan the table.
+    """
+
+    def __init__(self, latency: float = 0.0, max_rows: Optional[int] = None):
+        self.latency = latency
+        self.max_rows = max_rows
+        self.round_trips = 0
+        self.tables: Dict[str, List[dict]] = defaultdict(list)
+        self._ids: Dict[str, int] = defaultdict(int)
+        # table -> column -> index key -> {insertion sequence: row}
+        self._indexes: Dict[str, Dict[str, Dict[tuple, Dict[int, dict]]]] = defaultdict(dict)
+        self._sequence = itertools.count()
+        self._row_sequence: Dict[int, int] = {}  # id(row) -> insertion sequence
+
+    def next_id(self, table: str) -> int:
+        self._ids[table] += 1
+        return self._ids[table]
+
+    def table(self, name: str) -> InMemoryQuery:
+        return InMemoryQuery(self, name)
+
+    def rpc(self, func: str, params: dict) -> InMemoryRPC:
+        return InMemoryRPC(self, func, params)
+
+    def insert_rows(self, table: str, rows) -> List[dict]:
+        """Seed rows directly, without counting a round trip."""
+        return self.table(table).insert(rows)._run().data
+
+    # --- storage and hash indexes; all writes go through these ---
+
+    def _index(self, table: str, column: str) -> Dict[tuple, Dict[int, dict]]:
+        index = self._indexes[table].get(column)
+        if index is None:
+            index = defaultdict(dict)
+            for row in self.tables[table]:
+                if row.get(column) is not None:
+                    index[_row_key(row[column])][self._row_sequence[id(row)]] = row
+            self._indexes[table][column] = index
+        return index
+
+    def _unindex(self, table: str, row: dict, columns):
+        sequence = self._row_sequence[id(row)]
+        for column in columns:
+            index = self._indexes[table].get(column)
+            if index is not None and row.get(column) is not None:
+                bucket = index.get(_row_key(row[column]))
+                if bucket is not None:
+                    bucket.pop(sequence, None)
+                    if not bucket:
+                        del index[_row_key(row[column])]
+
+    def _reindex(self, table: str, row: dict, columns):
+        sequence = self._row_sequence[id(row)]
+        for column in columns:
+            index = self._indexes[table].get(column)
+            if index is not None and row.get(column) is not None:
+                index[_row_key(row[column])][sequence] = row
+
+    def add_row(self, table: str, row: dict):
+        self._row_sequence[id(row)] = next(self._sequence)
+        self.tables[table].append(row)
+        self._reindex(table, row, self._indexes[table])
+
+    def update_row(self, table: str, row: dict, values: dict):
+        indexed = [c for c in values if c in self._indexes[table]]
+        self._unindex(table, row, indexed)
+        row.update(values)
+        self._reindex(table, row, indexed)
+
+    def remove_rows(self, table: str, rows: List[dict]):
+        if not rows:
+            return
+        removed = {id(row) for row in rows}
+        for row in rows:
+            self._unindex(table, row, list(self._indexes[table]))
+        self.tables[table] = [row for row in self.tables[table] if id(row) not in removed]
+        for row_id in removed:
+            del self._row_sequence[row_id]
+
+    def _buckets(self, table: str, column: str, value) -> List[Dict[int, dict]]:
+        if value is None:
+            return []
+        index = self._index(table, column)
+        return [index[key] for key in _operand_keys(value) if key in index]
+
+    def bucket_size(self, table: str, column: str, value) -> int:
+        return sum(len(bucket) for bucket in self._buckets(table, column, value))
+
+    def lookup(self, table: str, column: str, value) -> List[dict]:
+        """Rows whose ``column`` equals ``value``, in insertion order."""
+        buckets = self._buckets(table, column, value)
+        if len(buckets) == 1:
+            return [buckets[0][seq] for seq in sorted(buckets[0])]
+        merged = {seq: row for bucket in buckets for seq, row in bucket.items()}
+        return [merged[seq] for seq in sorted(merged)]
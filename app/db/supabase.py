@@ -1,10 +1,65 @@
-from supabase import create_client, Client
-from app.core.config import SUPABASE_URL, SUPABASE_KEY
+import asyncio
+from typing import TYPE_CHECKING, Optional
 
-_supabase_client: Client | None = None
+from app.core.config import get_settings
+from app.db.memory import InMemoryClient
 
-def get_supabase_client() -> Client:
-    global _supabase_client
+# the supabase stack and httpx are only imported once a real client is built
+if TYPE_CHECKING:
+    import httpx
+    from supabase import AsyncClient
+    from app.db.http_pool import MonitoredTransport
+
+_supabase_client: Optional["AsyncClient"] = None
+_http_client: Optional["httpx.AsyncClient"] = None
+_pool: Optional["MonitoredTransport"] = None
+# concurrent first requests must not each build a client and pool
+_client_lock = asyncio.Lock()
+
+
+async def get_supabase_client() -> "AsyncClient":
+    """
+    Returns the process-wide client. The lifespan in main.py builds it at
+    startup; scripts that run outside the app build it on first use.
+    """
+    global _supabase_client, _http_client, _pool
     if _supabase_client is None:
-        _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        async with _client_lock:
+            if _supabase_client is None:
+                settings = get_settings()
+                if settings.supabase_backend == "memory":
+                    _supabase_client = InMemoryClient()
+                else:
+                    from supabase import AsyncClientOptions, acreate_client
+                    from app.db.http_pool import build_http_client
+
+                    _http_client, _pool = build_http_client(
+                        max_connections=settings.pool_max_connections,
+                        max_keepalive=settings.pool_max_keepalive,
+                        keepalive_expiry=settings.keepalive_expiry_seconds,
+                        timeout=settings.timeout_seconds,
+                        connect_timeout=settings.connect_timeout_seconds,
+                        pool_timeout=settings.pool_timeout_seconds,
+                        http2=settings.http2,
+                    )
+                    _supabase_client = await acreate_client(
+                        settings.supabase_url,
+                        settings.supabase_key,
+                        options=AsyncClientOptions(httpx_client=_http_client),
+                    )
     return _supabase_client
+
+
+async def close_supabase_client():
+    """Closes the shared HTTP pool; the next ``get_supabase_client()`` builds a new one."""
+    global _supabase_client, _http_client, _pool
+    async with _client_lock:
+        if _http_client is not None:
+            await _http_client.aclose()
+            _supabase_client, _http_client, _pool = None, None, None
+
+
+def pool_stats() -> dict:
+    if _pool is None:
+        return {"enabled": False}
+    return {"enabled": True, **_pool.stats()}
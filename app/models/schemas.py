@@ -1,5 +1,5 @@
 from datetime import date
-from typing import Optional, List
+from typing import List, Literal, Optional, Union
 from pydantic import BaseModel
 
 class UserCreate(BaseModel):
@@ -24,3 +24,98 @@ class RecipeCreate(BaseModel):
     title: str
     description: Optional[str] = None
     ingredients: List[FoodItemCreate]
+
+class ShoppingListRequest(BaseModel):
+    recipe_ids: List[int]
+
+# Response models. Routes that return repository rows as-is declare these for
+# the OpenAPI docs but hand back an ORJSONResponse, so the rows are not
+# validated a second time on the way out.
+
+class FoodItem(BaseModel):
+    id: int
+    user_id: Optional[int] = None
+    name: Optional[str] = None
+    name_norm: Optional[str] = None
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+    expiration_date: Optional[date] = None
+
+class FoodItemPage(BaseModel):
+    items: List[FoodItem]
+    next_cursor: Optional[str] = None
+
+class FoodItemList(BaseModel):
+    items: List[FoodItem]
+
+class FoodItemSaved(BaseModel):
+    message: str
+    data: List[FoodItem]
+
+class BulkFoodItemResult(BaseModel):
+    status: Literal["created", "updated"]
+    data: FoodItem
+
+class BulkFoodItemsSaved(BaseModel):
+    message: str
+    items: List[BulkFoodItemResult]
+
+class RecipeIngredient(BaseModel):
+    id: int
+    recipe_id: int
+    name: str
+    name_norm: Optional[str] = None
+    quantity: Optional[Union[float, str]] = None
+    unit: Optional[str] = None
+
+class Recipe(BaseModel):
+    id: int
+    user_id: int
+    title: str
+    description: Optional[str] = None
+
+class RecipeSaved(BaseModel):
+    message: str
+    recipe: Recipe
+    ingredients: List[RecipeIngredient]
+
+class Shortfall(BaseModel):
+    name: str
+    quantity: Optional[float] = None  # None when the recipe gives no amount
+    unit: Optional[str] = None
+
+class RecipeSuggestion(BaseModel):
+    title: str
+    description: Optional[str] = None
+    score: float
+    ingredients: Optional[List[str]] = None  # set when the recipe can be cooked
+    missing_ingredients: Optional[List[str]] = None
+    shortfall: Optional[List[Shortfall]] = None
+
+class RecipeSuggestions(BaseModel):
+    suggestions: List[RecipeSuggestion]
+
+class RecipeImportProgress(BaseModel):
+    imported: int
+    total: int
+    recipe_ids: List[int]  # ids created by the latest chunk
+
+class RecipeImportResult(BaseModel):
+    message: str
+    recipe_ids: List[int]
+
+class RecipeImportFailed(BaseModel):
+    error: str
+    imported: int
+    total: int
+    recipe_ids: Optional[List[int]] = None  # everything committed before the failure; not on the NDJSON line
+
+class ShoppingListItem(BaseModel):
+    name: str
+    name_norm: str
+    quantity: Optional[float] = None  # in the base unit (g, ml, pcs); None when no recipe gives an amount
+    unit: Optional[str] = None
+    recipes: List[str]
+
+class ShoppingList(BaseModel):
+    items: List[ShoppingListItem]
@@ -1,14 +1,21 @@
 from datetime import date
-from supabase import Client
+from typing import TYPE_CHECKING, Optional, Tuple
+from app.core.config import POSTGREST_MAX_ROWS
+from app.db.instrumentation import instrument
 from app.models.schemas import FoodItemCreate
-from app.services.utils import normalize_name
+from app.services.utils import escape_like, normalize_name
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+FOOD_COLUMNS = ("id", "user_id", "name", "name_norm", "quantity", "unit", "expiration_date")
 
 class FoodRepository:
-    def __init__(self, client: Client):
-        self.client = client
+    def __init__(self, client: "AsyncClient"):
+        self.client = instrument(client)
 
-    def find_existing_food_row(self, user_id: int, name: str, unit: str, expiration_date: date):
-        resp = (
+    async def find_existing_food_row(self, user_id: int, name: str, unit: str, expiration_date: date):
+        resp = await (
             self.client.table("food_stock")
             .select("*")
             .eq("user_id", user_id)
@@ -20,8 +27,8 @@ class FoodRepository:
         )
         return resp.data[0] if resp.data else None
 
-    def insert_food_item(self, user_id: int, item: FoodItemCreate):
-        resp = (
+    async def insert_food_item(self, user_id: int, item: FoodItemCreate):
+        resp = await (
             self.client.table("food_stock")
             .insert({
                 "user_id": user_id,
@@ -35,8 +42,32 @@ class FoodRepository:
         )
         return resp.data
 
-    def update_food_quantity(self, food_id: int, user_id: int, quantity: float):
-        resp = (
+    async def upsert_food_items(self, user_id: int, items: list):
+        """
+        Adds each lot's quantity to the matching (name_norm, unit,
+        expiration_date) row or inserts it, in one call. Returned rows carry
+        a ``created`` flag.
+        """
+        resp = await self.client.rpc(
+            "upsert_food_items",
+            {
+                "p_user_id": user_id,
+                "p_items": [
+                    {
+                        "name": item["name"],
+                        "name_norm": item["name_norm"],
+                        "quantity": item["quantity"],
+                        "unit": item["unit"],
+                        "expiration_date": str(item["expiration_date"]),
+                    }
+                    for item in items
+                ],
+            },
+        ).execute()
+        return resp.data or []
+
+    async def update_food_quantity(self, food_id: int, user_id: int, quantity: float):
+        resp = await (
             self.client.table("food_stock")
             .update({"quantity": quantity})
             .eq("id", food_id)
@@ -45,35 +76,103 @@ class FoodRepository:
         )
         return resp.data
 
-    def get_all_food_items(self, user_id: int):
-        resp = self.client.table("food_stock").select("*").eq("user_id", user_id).execute()
+    async def consume_food_item(self, user_id: int, item_id: int, quantity: float):
+        """
+        Decrements the row and deletes it once it reaches zero, atomically on
+        the server. Returns the resulting row with a ``removed`` flag, or None.
+        """
+        resp = await self.client.rpc(
+            "consume_food_item",
+            {"p_user_id": user_id, "p_item_id": item_id, "p_quantity": quantity},
+        ).execute()
+        return resp.data[0] if resp.data else None
+
+    async def get_all_food_items(self, user_id: int, page_size: int = POSTGREST_MAX_ROWS):
+        """
+        Every lot of the user, read in keyset pages of ``page_size``. A single
+        select would be cut off at PostgREST's max-rows.
+        """
+        rows, after = [], None
+        while True:
+            page = await self.get_food_page(user_id, page_size, after=after)
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            after = (page[-1]["expiration_date"], page[-1]["id"])
+
+    async def get_food_page(
+        self,
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[Optional[str], int]] = None,
+        columns: str = "*",
+        name_prefix: Optional[str] = None,
+        unit: Optional[str] = None,
+    ):
+        """
+        One page in (expiration_date, id) order, resuming after the given key.
+        Rows without an expiration date sort last, as in Postgres.
+        """
+        query = self.client.table("food_stock").select(columns).eq("user_id", user_id)
+        if name_prefix:
+            query = query.like("name_norm", escape_like(normalize_name(name_prefix)) + "%")
+        if unit:
+            query = query.eq("unit", unit)
+        if after is not None:
+            expiration_date, last_id = after
+            if expiration_date is None:
+                query = query.is_("expiration_date", "null").gt("id", last_id)
+            else:
+                query = query.or_(
+                    f"expiration_date.gt.{expiration_date},"
+                    f"and(expiration_date.eq.{expiration_date},id.gt.{last_id}),"
+                    f"expiration_date.is.null"
+                )
+        resp = await (
+            query.order("expiration_date", desc=False)
+            .order("id", desc=False)
+            .limit(limit)
+            .execute()
+        )
         return resp.data or []
 
-    def get_food_item_detail(self, user_id: int, item_id: int):
-        resp = (
+    async def get_expiration_page(
+        self, start: date, limit: int, after: Optional[Tuple[str, int]] = None
+    ):
+        """Lots of all users expiring on or after ``start``, in (expiration_date, id) order."""
+        query = (
             self.client.table("food_stock")
-            .select("*")
-            .eq("user_id", user_id)
-            .eq("id", item_id)
-            .limit(1)
+            .select("id,user_id,name,quantity,unit,expiration_date")
+            .gte("expiration_date", str(start))
+        )
+        if after is not None:
+            expiration_date, last_id = after
+            query = query.or_(
+                f"expiration_date.gt.{expiration_date},"
+                f"and(expiration_date.eq.{expiration_date},id.gt.{last_id})"
+            )
+        resp = await (
+            query.order("expiration_date", desc=False)
+            .order("id", desc=False)
+            .limit(limit)
             .execute()
         )
-        return resp.data[0] if resp.data else None
-
-    def delete_food_item(self, user_id: int, item_id: int):
-        self.client.table("food_stock").delete().eq("user_id", user_id).eq("id", item_id).execute()
-
-    def delete_all_food_for_user(self, user_id: int):
-        self.client.table("food_stock").delete().eq("user_id", user_id).execute()
+        return resp.data or []
 
-    def get_expiring_items(self, user_id: int, start: date, end: date):
-        resp = (
+    async def get_food_item_detail(self, user_id: int, item_id: int):
+        resp = await (
             self.client.table("food_stock")
             .select("*")
             .eq("user_id", user_id)
-            .gte("expiration_date", str(start))
-            .lte("expiration_date", str(end))
-            .order("expiration_date", desc=False)
+            .eq("id", item_id)
+            .limit(1)
             .execute()
         )
+        return resp.data[0] if resp.data else None
+
+    async def delete_food_item(self, user_id: int, item_id: int):
+        resp = await self.client.table("food_stock").delete().eq("user_id", user_id).eq("id", item_id).execute()
         return resp.data or []
+
+    async def delete_all_food_for_user(self, user_id: int):
+        await self.client.table("food_stock").delete().eq("user_id", user_id).execute()
@@ -1,43 +1,99 @@
-from supabase import Client
+from typing import TYPE_CHECKING, List, Optional
+from app.core.config import POSTGREST_MAX_ROWS
+from app.db.instrumentation import instrument
 from app.models.schemas import RecipeCreate
 from app.services.utils import normalize_name
 
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
 class RecipeRepository:
-    def __init__(self, client: Client):
-        self.client = client
+    def __init__(self, client: "AsyncClient"):
+        self.client = instrument(client)
 
-    def create_recipe(self, user_id: int, payload: RecipeCreate):
-        recipe_resp = (
-            self.client.table("recipes")
-            .insert({
-                "user_id": user_id,
-                "title": payload.title,
-                "description": payload.description or "",
-            })
-            .execute()
-        )
-        return recipe_resp.data[0] if recipe_resp.data else None
+    @staticmethod
+    def _ingredient_fields(ing) -> dict:
+        return {
+            "name": ing.name,
+            "name_norm": normalize_name(ing.name),
+            "quantity": ing.quantity,
+            "unit": ing.unit,
+        }
+
+    async def save_recipe(self, user_id: int, payload: RecipeCreate):
+        """
+        Recipe and ingredients in one call to the ``save_recipe`` function,
+        i.e. one round trip and one transaction. Returns the recipe row with
+        its ingredient rows under ``ingredients``.
+        """
+        resp = await self.client.rpc(
+            "save_recipe",
+            {
+                "p_user_id": user_id,
+                "p_title": payload.title,
+                "p_description": payload.description or "",
+                "p_ingredients": [self._ingredient_fields(ing) for ing in payload.ingredients],
+            },
+        ).execute()
+        return resp.data[0] if resp.data else None
 
-    def add_ingredients(self, recipe_id: int, ingredients: list):
-        ing_rows = [
+    async def import_recipes(self, user_id: int, payloads: List[RecipeCreate]):
+        """
+        Any number of recipes in one call to the ``import_recipes`` function,
+        i.e. one round trip and one transaction for the whole batch. Returns
+        the recipe rows in payload order, each with its ingredient rows under
+        ``ingredients``.
+        """
+        resp = await self.client.rpc(
+            "import_recipes",
             {
-                "recipe_id": recipe_id,
-                "name": ing.name,
-                "name_norm": normalize_name(ing.name),
-                "quantity": ing.quantity,
-                "unit": ing.unit,
-            }
-            for ing in ingredients
-        ]
-        resp = self.client.table("recipe_ingredients").insert(ing_rows).execute()
-        return resp.data
-
-    def get_recipes_for_user(self, user_id: int):
-        resp = self.client.table("recipes").select("*").eq("user_id", user_id).execute()
+                "p_user_id": user_id,
+                "p_recipes": [
+                    {
+                        "title": p.title,
+                        "description": p.description or "",
+                        "ingredients": [self._ingredient_fields(ing) for ing in p.ingredients],
+                    }
+                    for p in payloads
+                ],
+            },
+        ).execute()
+        recipes = resp.data or []
+        if len(recipes) != len(payloads):
+            raise RuntimeError(f"Imported {len(recipes)} of {len(payloads)} recipes")
+        return recipes
+
+    async def get_recipes_for_user(self, user_id: int):
+        resp = await self.client.table("recipes").select("*").eq("user_id", user_id).execute()
+        return resp.data or []
+
+    async def get_recipes_with_ingredients(self, user_id: int, page_size: int = POSTGREST_MAX_ROWS):
+        """
+        Every recipe of the user with its ingredients, read in pages of
+        ``page_size`` by id. A single select would be cut off at PostgREST's
+        max-rows.
+        """
+        recipes, after_id = [], None
+        while True:
+            page = await self.get_recipe_page(user_id, page_size, after_id=after_id)
+            recipes.extend(page)
+            if len(page) < page_size:
+                return recipes
+            after_id = page[-1]["id"]
+
+    async def get_recipe_page(self, user_id: int, limit: int, after_id: Optional[int] = None):
+        query = (
+            self.client.table("recipes")
+            .select("*, recipe_ingredients(*)")
+            .eq("user_id", user_id)
+        )
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        resp = await query.order("id", desc=False).limit(limit).execute()
         return resp.data or []
 
-    def get_ingredients_for_recipe(self, recipe_id: int):
-        resp = (
+    async def get_ingredients_for_recipe(self, recipe_id: int):
+        resp = await (
             self.client.table("recipe_ingredients")
             .select("*")
             .eq("recipe_id", recipe_id)
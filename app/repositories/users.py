@@ -1,14 +1,18 @@
-from supabase import Client
-from app.core.security import hash_password
+from typing import TYPE_CHECKING
+from app.db.instrumentation import instrument
+from app.core.security import password_hasher
 from app.models.schemas import UserCreate
 
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
 class UserRepository:
-    def __init__(self, client: Client):
-        self.client = client
+    def __init__(self, client: "AsyncClient"):
+        self.client = instrument(client)
 
-    def create_user(self, user: UserCreate):
-        password_hash = hash_password(user.password)
-        response = (
+    async def create_user(self, user: UserCreate):
+        password_hash = await password_hasher.hash(user.password)
+        response = await (
             self.client.table("users")
             .insert({
                 "username": user.username,
@@ -19,8 +23,8 @@ class UserRepository:
         )
         return response.data
 
-    def get_user_by_username(self, username: str):
-        response = (
+    async def get_user_by_username(self, username: str):
+        response = await (
             self.client.table("users")
             .select("*")
             .eq("username", username)
@@ -28,3 +32,12 @@ class UserRepository:
             .execute()
         )
         return response.data[0] if response.data else None
+
+    async def update_password_hash(self, user_id: int, password_hash: str):
+        response = await (
+            self.client.table("users")
+            .update({"password_hash": password_hash})
+            .eq("id", user_id)
+            .execute()
+        )
+        return response.data
@@ -0,0 +1,95 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# variant -> canonical name; both sides go through the same folding and
+# stemming as user input, so entries can be written in any form
+SYNONYMS = {
+    "roma tomato": "tomato",
+    "cherry tomato": "tomato",
+    "plum tomato": "tomato",
+    "paradeiser": "tomate",
+    "scallion": "spring onion",
+    "green onion": "spring onion",
+    "lauchzwiebel": "frühlingszwiebel",
+    "courgette": "zucchini",
+    "aubergine": "eggplant",
+    "melanzani": "eggplant",
+    "coriander": "cilantro",
+    "chilli": "chili",
+    "garbanzo bean": "chickpea",
+    "capsicum": "bell pepper",
+    "rocket": "arugula",
+    "rucola": "arugula",
+    "erdapfel": "kartoffel",
+    "karfiol": "blumenkohl",
+    "topfen": "quark",
+    "schlagobers": "sahne",
+    "obers": "sahne",
+    "semmel": "brötchen",
+}
+
+# plurals the suffix rules below get wrong, and words whose final "s" is
+# part of the singular
+IRREGULAR_SINGULARS = {
+    "cookies": "cookie",
+    "brownies": "brownie",
+    "veggies": "veggie",
+    "smoothies": "smoothie",
+    "goodies": "goodie",
+    "chilies": "chili",
+    "chillies": "chilli",
+    "chilis": "chili",
+    "kiwis": "kiwi",
+    "zucchinis": "zucchini",
+    "salamis": "salami",
+    "raviolis": "ravioli",
+    "quiches": "quiche",
+    "brioches": "brioche",
+    "leaves": "leaf",
+    "loaves": "loaf",
+    "kokos": "kokos",
+    "ananas": "ananas",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_KEEP_TRAILING_S = ("ss", "us", "is")
+
+
+def _fold(s: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", s.strip().casefold())
+    folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(" ", folded)
+
+
+def _singular(word: str) -> str:
+    if len(word) <= 3:
+        return word
+    if word in IRREGULAR_SINGULARS:
+        return IRREGULAR_SINGULARS[word]
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes", "sses")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(_KEEP_TRAILING_S):
+        return word[:-1]
+    return word
+
+
+def _stem(s: str) -> str:
+    return " ".join(_singular(word) for word in _fold(s).split(" "))
+
+
+_CANONICAL = {_stem(variant): _stem(canonical) for variant, canonical in SYNONYMS.items()}
+
+
+@lru_cache(maxsize=65536)
+def canonical_name(s: str) -> str:
+    """
+    Matching key for an ingredient or food name: case and accents folded,
+    whitespace collapsed, each word singularised and the result mapped
+    through SYNONYMS. "Roma Tomatoes", "tomato" and "Tomato" all give
+    "tomato".
+    """
+    stemmed = _stem(s)
+    return _CANONICAL.get(stemmed, stemmed)
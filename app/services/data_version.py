@@ -0,0 +1,27 @@
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class DataVersions:
+    """
+    Per-user counter bumped on every write to a user's food stock or
+    recipes in this process. Anything derived from that data and keyed by
+    the version is invalidated by the next write.
+    """
+
+    def __init__(self):
+        self._versions: Dict[int, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> int:
+        with self._lock:
+            return self._versions[user_id]
+
+    def bump(self, user_id: int) -> int:
+        with self._lock:
+            self._versions[user_id] += 1
+            return self._versions[user_id]
+
+
+data_versions = DataVersions()
@@ -0,0 +1,63 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Dict, List, Tuple
+
+from app.core.config import EXPIRY_INDEX_MAX_USERS, EXPIRY_INDEX_TTL_SECONDS
+from app.services.user_index import UserIndexRegistry
+
+
+class UserExpiryIndex:
+    """
+    One user's dated lots as a sorted list of ``(expiration_date, id)`` keys.
+    ISO dates sort like the dates themselves, so any window is two binary
+    searches and a slice; a write inserts or removes a single key.
+    """
+
+    def __init__(self, food_items: List[dict]):
+        self.lock = threading.Lock()
+        self.built_at = time.monotonic()
+        self.lots: Dict[int, dict] = {
+            row["id"]: row for row in food_items if row.get("expiration_date")
+        }
+        self.keys: List[Tuple[str, int]] = sorted(self._key(row) for row in self.lots.values())
+
+    @staticmethod
+    def _key(row: dict) -> Tuple[str, int]:
+        return str(row["expiration_date"]), row["id"]
+
+    def _discard(self, row_id: int):
+        previous = self.lots.pop(row_id, None)
+        if previous is None:
+            return
+        key = self._key(previous)
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+
+    def add_lot(self, row: dict):
+        with self.lock:
+            self._discard(row["id"])
+            if row.get("expiration_date"):
+                self.lots[row["id"]] = row
+                insort(self.keys, self._key(row))
+
+    def remove_lot(self, row: dict):
+        with self.lock:
+            self._discard(row["id"])
+
+    def clear_stock(self):
+        with self.lock:
+            self.lots.clear()
+            self.keys.clear()
+
+    def window(self, start: date, end: date) -> List[dict]:
+        """Lots expiring between ``start`` and ``end``, both inclusive, soonest first."""
+        with self.lock:
+            lo = bisect_left(self.keys, (start.isoformat(),))
+            hi = bisect_right(self.keys, (end.isoformat(), float("inf")))
+            return [self.lots[row_id] for _, row_id in self.keys[lo:hi]]
+
+
+expiry_indexes = UserIndexRegistry(max_users=EXPIRY_INDEX_MAX_USERS, ttl=EXPIRY_INDEX_TTL_SECONDS)
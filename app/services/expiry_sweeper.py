@@ -0,0 +1,200 @@
+import asyncio
+import heapq
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.config import (
+    EXPIRY_RESCAN_SECONDS,
+    EXPIRY_SCAN_PAGE_SIZE,
+    EXPIRY_WARNING_DAYS,
+    POSTGREST_MAX_ROWS,
+)
+from app.repositories.food import FoodRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ExpirySweeper:
+    """
+    Background job that keeps a per-user digest of lots expiring within
+    ``warning_days``. All upcoming expiration dates are loaded in one
+    chunked scan into a min-heap keyed by the day each lot enters its
+    warning window; the task then sleeps until the top of the heap is due
+    instead of polling. FoodService writes made in this process are pushed
+    in directly; a periodic rescan picks up writes from other processes.
+    """
+
+    def __init__(
+        self,
+        warning_days: int = EXPIRY_WARNING_DAYS,
+        page_size: int = EXPIRY_SCAN_PAGE_SIZE,
+        rescan_seconds: float = EXPIRY_RESCAN_SECONDS,
+        today: Callable[[], date] = date.today,
+    ):
+        self.warning_days = warning_days
+        # a larger page would come back cut off at max-rows and end the scan early
+        self.page_size = min(page_size, POSTGREST_MAX_ROWS)
+        self.rescan_seconds = rescan_seconds
+        self.today = today
+        self.ready = False
+        self.last_scan: Optional[dict] = None
+        self._heap: List[Tuple[date, int]] = []  # (warn_on, item_id)
+        self._lots: Dict[int, dict] = {}
+        self._digests: Dict[int, Dict[int, dict]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _lot(self, row: dict) -> Optional[dict]:
+        if not row.get("expiration_date"):
+            return None
+        expiration_date = date.fromisoformat(str(row["expiration_date"]))
+        return {
+            "id": row["id"],
+            "user_id": row["user_id"],
+            "name": row["name"],
+            "quantity": row["quantity"],
+            "unit": row["unit"],
+            "expiration_date": expiration_date,
+            "warn_on": expiration_date - timedelta(days=self.warning_days),
+        }
+
+    async def scan(self, food_repo: FoodRepository):
+        started = time.perf_counter()
+        today = self.today()
+        lots: Dict[int, dict] = {}
+        heap: List[Tuple[date, int]] = []
+        after, pages = None, 0
+        while True:
+            rows = await food_repo.get_expiration_page(today, self.page_size, after=after)
+            pages += 1
+            for row in rows:
+                lot = self._lot(row)
+                lots[lot["id"]] = lot
+                heap.append((lot["warn_on"], lot["id"]))
+            if len(rows) < self.page_size:
+                break
+            after = (rows[-1]["expiration_date"], rows[-1]["id"])
+        heapq.heapify(heap)
+
+        self._lots, self._heap, self._digests = lots, heap, {}
+        self.release_due()
+        self.ready = True
+        self.last_scan = {
+            "lots": len(lots),
+            "pages": pages,
+            "seconds": round(time.perf_counter() - started, 3),
+            "finished_at": datetime.utcnow().isoformat(),
+        }
+
+    def release_due(self):
+        """Moves every lot whose warning window has started into its user's digest."""
+        today = self.today()
+        while self._heap and self._heap[0][0] <= today:
+            warn_on, item_id = heapq.heappop(self._heap)
+            lot = self._lots.get(item_id)
+            if lot is None or lot["warn_on"] != warn_on:
+                continue  # removed or re-dated since it was pushed
+            self._digests.setdefault(lot["user_id"], {})[item_id] = lot
+
+        for user_id, items in list(self._digests.items()):
+            for item_id, lot in list(items.items()):
+                if lot["expiration_date"] < today:
+                    del items[item_id]
+                    self._lots.pop(item_id, None)
+            if not items:
+                del self._digests[user_id]
+
+    def digest(self, user_id: int) -> List[dict]:
+        items = sorted(self._digests.get(user_id, {}).values(), key=lambda l: (l["expiration_date"], l["id"]))
+        return [
+            {k: (str(v) if k == "expiration_date" else v) for k, v in lot.items() if k != "warn_on"}
+            for lot in items
+        ]
+
+    # --- write notifications from FoodService ---
+
+    def lot_saved(self, row: dict):
+        if not self.ready:
+            return
+        self.lot_removed(row)
+        lot = self._lot(row)
+        if lot is None or lot["expiration_date"] < self.today():
+            return
+        self._lots[lot["id"]] = lot
+        if lot["warn_on"] <= self.today():
+            self._digests.setdefault(lot["user_id"], {})[lot["id"]] = lot
+        else:
+            heapq.heappush(self._heap, (lot["warn_on"], lot["id"]))
+            if self._heap[0][1] == lot["id"] and self._wakeup is not None:
+                self._wakeup.set()
+
+    def lot_removed(self, row: dict):
+        lot = self._lots.pop(row["id"], None)
+        if lot is not None:
+            self._digests.get(lot["user_id"], {}).pop(lot["id"], None)
+
+    def stock_cleared(self, user_id: int):
+        for item_id in [i for i, lot in self._lots.items() if lot["user_id"] == user_id]:
+            del self._lots[item_id]
+        self._digests.pop(user_id, None)
+
+    # --- background task ---
+
+    def _seconds_until_next_wake(self) -> float:
+        now = datetime.now()
+        candidates = []
+        if self._heap:
+            candidates.append(datetime.combine(self._heap[0][0], datetime.min.time()))
+        if self._digests:
+            candidates.append(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+        if not candidates:
+            return float("inf")
+        return max((min(candidates) - now).total_seconds(), 0.0)
+
+    async def _run(self, food_repo: FoodRepository):
+        next_scan = 0.0
+        while True:
+            if time.monotonic() >= next_scan:
+                try:
+                    await self.scan(food_repo)
+                    next_scan = time.monotonic() + self.rescan_seconds
+                except Exception:
+                    logger.exception("Expiry scan failed, retrying")
+                    next_scan = time.monotonic() + min(60.0, self.rescan_seconds)
+            else:
+                self.release_due()
+
+            timeout = min(next_scan - time.monotonic(), self._seconds_until_next_wake())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0.0))
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, food_repo: FoodRepository):
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(food_repo))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "warning_days": self.warning_days,
+            "tracked_lots": len(self._lots),
+            "pending_in_heap": len(self._heap),
+            "users_with_digest": len(self._digests),
+            "last_scan": self.last_scan,
+        }
+
+
+expiry_sweeper = ExpirySweeper()
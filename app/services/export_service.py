@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterable, List
+
+from app.core.config import EXPORT_PAGE_SIZE
+from app.repositories.food import FoodRepository
+from app.repositories.recipes import RecipeRepository
+
+CSV_COLUMNS = [
+    "record_type", "id", "recipe_id", "recipe_title", "name",
+    "quantity", "unit", "expiration_date", "description",
+]
+
+
+class ExportService:
+    """
+    Streams a user's food stock and recipes page by page, so only one page
+    of rows is held in memory however large the export is.
+    """
+
+    def __init__(self, food_repo: FoodRepository, recipe_repo: RecipeRepository, page_size: int = EXPORT_PAGE_SIZE):
+        self.food_repo = food_repo
+        self.recipe_repo = recipe_repo
+        self.page_size = page_size
+
+    async def _food_pages(self, user_id: int) -> AsyncIterator[List[dict]]:
+        after = None
+        while True:
+            rows = await self.food_repo.get_food_page(user_id, self.page_size, after=after)
+            if rows:
+                yield rows
+            if len(rows) < self.page_size:
+                return
+            after = (rows[-1]["expiration_date"], rows[-1]["id"])
+
+    async def _recipe_pages(self, user_id: int) -> AsyncIterator[List[dict]]:
+        after_id = None
+        while True:
+            recipes = await self.recipe_repo.get_recipe_page(user_id, self.page_size, after_id=after_id)
+            if recipes:
+                yield recipes
+            if len(recipes) < self.page_size:
+                return
+            after_id = recipes[-1]["id"]
+
+    async def ndjson(self, user_id: int) -> AsyncIterator[str]:
+        async for rows in self._food_pages(user_id):
+            yield "".join(json.dumps({"type": "food", **row}, default=str) + "\n" for row in rows)
+        async for recipes in self._recipe_pages(user_id):
+            chunk = []
+            for recipe in recipes:
+                ingredients = recipe.pop("recipe_ingredients", None) or []
+                chunk.append(json.dumps({"type": "recipe", **recipe, "ingredients": ingredients}, default=str) + "\n")
+            yield "".join(chunk)
+
+    @staticmethod
+    def _csv_chunk(rows: Iterable[dict]) -> str:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+    async def csv(self, user_id: int) -> AsyncIterator[str]:
+        header = io.StringIO()
+        csv.writer(header).writerow(CSV_COLUMNS)
+        yield header.getvalue()
+
+        async for rows in self._food_pages(user_id):
+            yield self._csv_chunk({"record_type": "food", **row} for row in rows)
+        async for recipes in self._recipe_pages(user_id):
+            records = []
+            for recipe in recipes:
+                records.append({
+                    "record_type": "recipe",
+                    "id": recipe["id"],
+                    "name": recipe["title"],
+                    "description": recipe.get("description"),
+                })
+                for ing in recipe.get("recipe_ingredients") or []:
+                    records.append({
+                        "record_type": "recipe_ingredient",
+                        "recipe_id": recipe["id"],
+                        "recipe_title": recipe["title"],
+                        **ing,
+                    })
+            yield self._csv_chunk(records)
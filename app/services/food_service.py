@@ -1,15 +1,47 @@
 from datetime import date, timedelta
+from typing import List, Optional
 from fastapi import HTTPException
 
 from app.models.schemas import FoodItemCreate, FoodItemConsume
-from app.repositories.food import FoodRepository
+from app.repositories.food import FOOD_COLUMNS, FoodRepository
+from app.services.utils import decode_cursor, encode_cursor, normalize_name
+from app.services.expiry_index import UserExpiryIndex, expiry_indexes
+from app.services.expiry_sweeper import ExpirySweeper, expiry_sweeper
+from app.services.ingredient_index import ingredient_indexes
+from app.services.user_index import UserIndexRegistry
 
 class FoodService:
-    def __init__(self, food_repo: FoodRepository):
+    def __init__(
+        self,
+        food_repo: FoodRepository,
+        indexes: UserIndexRegistry = ingredient_indexes,
+        sweeper: ExpirySweeper = expiry_sweeper,
+        expiry_indexes: UserIndexRegistry = expiry_indexes,
+    ):
         self.food_repo = food_repo
+        self.indexes = indexes
+        self.sweeper = sweeper
+        self.expiry_indexes = expiry_indexes
 
-    def add_or_update_food_item(self, user_id: int, item: FoodItemCreate):
-        existing = self.food_repo.find_existing_food_row(
+    def _lots_saved(self, user_id: int, rows):
+        for row in rows or []:
+            self.indexes.lot_saved(user_id, row)
+            self.expiry_indexes.lot_saved(user_id, row)
+            self.sweeper.lot_saved(row)
+
+    def _lots_removed(self, user_id: int, rows):
+        for row in rows or []:
+            self.indexes.lot_removed(user_id, row)
+            self.expiry_indexes.lot_removed(user_id, row)
+            self.sweeper.lot_removed(row)
+
+    def _stock_cleared(self, user_id: int):
+        self.indexes.stock_cleared(user_id)
+        self.expiry_indexes.stock_cleared(user_id)
+        self.sweeper.stock_cleared(user_id)
+
+    async def add_or_update_food_item(self, user_id: int, item: FoodItemCreate):
+        existing = await self.food_repo.find_existing_food_row(
             user_id=user_id,
             name=item.name,
             unit=item.unit,
@@ -17,44 +49,128 @@ class FoodService:
         )
         if existing:
             new_qty = float(existing["quantity"]) + float(item.quantity)
-            data = self.food_repo.update_food_quantity(existing["id"], user_id, new_qty)
+            data = await self.food_repo.update_food_quantity(existing["id"], user_id, new_qty)
+            self._lots_saved(user_id, data)
             return "updated", data
         else:
-            data = self.food_repo.insert_food_item(user_id, item)
+            data = await self.food_repo.insert_food_item(user_id, item)
+            self._lots_saved(user_id, data)
             return "created", data
 
-    def list_food_items(self, user_id: int):
-        return self.food_repo.get_all_food_items(user_id)
+    async def bulk_add_food_items(self, user_id: int, items: List[FoodItemCreate]):
+        merged, keys = {}, []
+        for item in items:
+            key = (normalize_name(item.name), item.unit, str(item.expiration_date))
+            keys.append(key)
+            if key in merged:
+                merged[key]["quantity"] += float(item.quantity)
+            else:
+                merged[key] = {
+                    "name": item.name,
+                    "name_norm": key[0],
+                    "quantity": float(item.quantity),
+                    "unit": item.unit,
+                    "expiration_date": item.expiration_date,
+                }
+        if not merged:
+            return []
+
+        rows = await self.food_repo.upsert_food_items(user_id, list(merged.values()))
+        by_lot = {}
+        for row in rows:
+            created = row.pop("created", False)
+            key = (row["name_norm"], row["unit"], str(row["expiration_date"]))
+            by_lot[key] = {"status": "created" if created else "updated", "data": row}
+        self._lots_saved(user_id, rows)
+        if len(by_lot) < len(merged):
+            raise HTTPException(status_code=500, detail=f"Upsert returned {len(by_lot)} of {len(merged)} lots")
+        # one result per input item, in input order; items merged into the
+        # same lot share its result
+        return [by_lot[key] for key in keys]
+
+    async def list_food_items(
+        self,
+        user_id: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        unit: Optional[str] = None,
+    ):
+        columns = "*"
+        if fields:
+            requested = [f.strip() for f in fields.split(",") if f.strip()]
+            unknown = sorted(set(requested) - set(FOOD_COLUMNS))
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+            # the cursor is built from these two, so they are always selected
+            columns = ",".join(dict.fromkeys(["id", "expiration_date", *requested]))
+
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    def get_food_item(self, user_id: int, item_id: int):
-        item = self.food_repo.get_food_item_detail(user_id, item_id)
+        rows = await self.food_repo.get_food_page(
+            user_id, limit + 1, after=after, columns=columns, name_prefix=name_prefix, unit=unit
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last["expiration_date"], last["id"])
+        return {"items": rows, "next_cursor": next_cursor}
+
+    async def get_food_item(self, user_id: int, item_id: int):
+        item = await self.food_repo.get_food_item_detail(user_id, item_id)
         if not item:
             raise HTTPException(status_code=404, detail="Item not found")
         return item
 
-    def consume_item(self, user_id: int, item_id: int, body: FoodItemConsume):
-        item = self.food_repo.get_food_item_detail(user_id, item_id)
-        if not item:
+    async def consume_item(self, user_id: int, item_id: int, body: FoodItemConsume):
+        row = await self.food_repo.consume_food_item(user_id, item_id, float(body.quantity))
+        if not row:
             raise HTTPException(status_code=404, detail="Item not found")
 
-        new_qty = float(item["quantity"]) - float(body.quantity)
-        if new_qty <= 0:
-            self.food_repo.delete_food_item(user_id, item_id)
+        if row.pop("removed", False):
+            self._lots_removed(user_id, [row])
             return {"message": "Item consumed and removed"}
         else:
-            data = self.food_repo.update_food_quantity(item_id, user_id, new_qty)
-            return {"message": "Item quantity updated", "data": data}
+            self._lots_saved(user_id, [row])
+            return {"message": "Item quantity updated", "data": [row]}
 
-    def delete_item(self, user_id: int, item_id: int):
-        self.food_repo.delete_food_item(user_id, item_id)
+    async def delete_item(self, user_id: int, item_id: int):
+        deleted = await self.food_repo.delete_food_item(user_id, item_id)
+        self._lots_removed(user_id, deleted)
         return {"message": "Item deleted"}
 
-    def delete_all_food(self, user_id: int):
-        self.food_repo.delete_all_food_for_user(user_id)
+    async def delete_all_food(self, user_id: int):
+        await self.food_repo.delete_all_food_for_user(user_id)
+        self._stock_cleared(user_id)
         return {"message": f"All food items for user {user_id} deleted."}
 
-    def get_expiring_items(self, user_id: int, days: int = 5):
+    def get_expiry_digest(self, user_id: int):
+        if not self.sweeper.ready:
+            raise HTTPException(status_code=503, detail="Expiry digest not available yet")
+        return {
+            "warning_days": self.sweeper.warning_days,
+            "generated_at": self.sweeper.last_scan["finished_at"],
+            "items": self.sweeper.digest(user_id),
+        }
+
+    async def _get_expiry_index(self, user_id: int) -> UserExpiryIndex:
+        index = self.expiry_indexes.get(user_id)
+        if index is None:
+            version = self.expiry_indexes.begin_build(user_id)
+            index = UserExpiryIndex(await self.food_repo.get_all_food_items(user_id))
+            self.expiry_indexes.install(user_id, index, version)
+        return index
+
+    async def get_expiring_items(self, user_id: int, days: int = 5):
+        index = await self._get_expiry_index(user_id)
         today = date.today()
-        until = today + timedelta(days=days)
-        items = self.food_repo.get_expiring_items(user_id, today, until)
-        return {"items": items}
+        # a window past the calendar's end covers everything
+        end = today + timedelta(days=min(days, (date.max - today).days))
+        return {"items": index.window(today, end)}
@@ -0,0 +1,273 @@
+import heapq
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import INGREDIENT_INDEX_MAX_USERS, INGREDIENT_INDEX_TTL_SECONDS
+from app.services.units import base_unit, parse_quantity
+from app.services.user_index import UserIndexRegistry
+
+# numpy takes ~150 ms to import, so it is loaded by the first index that
+# builds its arrays rather than when the app is imported
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# summing lots in base units leaves float noise; smaller gaps count as covered
+SHORTFALL_TOLERANCE = 1e-6
+
+# score subtracted per requirement the stock cannot cover; a fully used
+# requirement adds at most 1.0, so makeable recipes rank first
+MISSING_PENALTY = 1.0
+
+# stock key dimension counting lots regardless of amount, for ingredients
+# whose quantity is missing or not a number ("1 Prise")
+ANY_AMOUNT = "*"
+
+StockKey = Tuple[str, str]  # (name_norm, base unit)
+
+
+class UserIngredientIndex:
+    """
+    In-process view of one user's recipe book and stock for feasibility
+    checks. Stock is summed per ``(name_norm, base unit)`` across lots;
+    every recipe becomes a set of requirements in the same units. All
+    requirements of all recipes are kept as flat NumPy arrays, so checking
+    the whole recipe book against the stock is one vectorised subtraction.
+    """
+
+    def __init__(self, recipes: List[dict], food_items: List[dict]):
+        self.lock = threading.RLock()
+        self.built_at = time.monotonic()
+        self.recipes: Dict[int, dict] = {}
+        self.lots: Dict[int, dict] = {}
+        self.stock: Dict[StockKey, float] = defaultdict(float)
+        self._have: Optional["np.ndarray"] = None  # None until the arrays are (re)built
+        self._suggestions: Optional[List[dict]] = None
+
+        for item in food_items:
+            self.add_lot(item)
+        for recipe in recipes:
+            self.add_recipe(recipe, recipe.get("recipe_ingredients") or [])
+
+    # --- recipes ---
+
+    def add_recipe(self, recipe: dict, ingredients: List[dict]):
+        with self.lock:
+            requirements: Dict[StockKey, dict] = {}
+            for ing in ingredients:
+                amount = parse_quantity(ing.get("quantity"))
+                if amount is None:
+                    key, need, factor = (ing["name_norm"], ANY_AMOUNT), 1.0, None
+                else:
+                    unit, factor = base_unit(ing.get("unit"))
+                    key, need = (ing["name_norm"], unit), amount * factor
+                if key in requirements:
+                    if factor is not None:
+                        requirements[key]["need"] += need
+                else:
+                    requirements[key] = {
+                        "name": ing["name"], "unit": ing.get("unit"), "factor": factor, "need": need,
+                    }
+            self.recipes[recipe["id"]] = {
+                "title": recipe["title"],
+                "description": recipe.get("description"),
+                "ingredients": [i["name"] for i in ingredients],
+                "requirements": requirements,
+            }
+            self._have = None
+            self._suggestions = None
+
+    def _build_arrays(self):
+        import numpy as np
+
+        self._recipe_ids = [rid for rid, r in self.recipes.items() if r["requirements"]]
+        self._key_index: Dict[StockKey, int] = {}
+        self._requirements: List[dict] = []
+        req_recipe, req_key, need, factor = [], [], [], []
+        for pos, recipe_id in enumerate(self._recipe_ids):
+            for key, requirement in self.recipes[recipe_id]["requirements"].items():
+                req_recipe.append(pos)
+                req_key.append(self._key_index.setdefault(key, len(self._key_index)))
+                need.append(requirement["need"])
+                factor.append(requirement["factor"] or np.nan)
+                self._requirements.append(requirement)
+        self._req_recipe = np.array(req_recipe, dtype=np.intp)
+        self._req_key = np.array(req_key, dtype=np.intp)
+        self._need = np.array(need, dtype=np.float64)
+        self._factor = np.array(factor, dtype=np.float64)
+        self._have = np.array([self.stock.get(k, 0.0) for k in self._key_index], dtype=np.float64)
+
+    # --- stock ---
+
+    @staticmethod
+    def _lot_amounts(row: dict) -> List[Tuple[StockKey, float]]:
+        unit, factor = base_unit(row.get("unit"))
+        amount = (parse_quantity(row.get("quantity")) or 0.0) * factor
+        return [((row["name_norm"], unit), amount), ((row["name_norm"], ANY_AMOUNT), 1.0)]
+
+    def _stock_changed(self, key: StockKey, delta: float):
+        self.stock[key] += delta
+        if self._have is None:
+            return
+        position = self._key_index.get(key)
+        if position is not None:
+            self._have[position] = self.stock[key]
+            self._suggestions = None
+
+    def add_lot(self, row: dict):
+        with self.lock:
+            if row["id"] in self.lots:
+                self.remove_lot(self.lots[row["id"]])
+            self.lots[row["id"]] = row
+            for key, amount in self._lot_amounts(row):
+                self._stock_changed(key, amount)
+
+    def remove_lot(self, row: dict):
+        with self.lock:
+            previous = self.lots.pop(row["id"], None)
+            if previous is None:
+                return
+            for key, amount in self._lot_amounts(previous):
+                self._stock_changed(key, -amount)
+
+    def clear_stock(self):
+        with self.lock:
+            self.lots.clear()
+            self.stock.clear()
+            if self._have is not None:
+                self._have[:] = 0.0
+            self._suggestions = None
+
+    # --- feasibility ---
+
+    def _shortfalls(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Per-requirement shortfall in base units and per-recipe count of short requirements."""
+        import numpy as np
+
+        if self._have is None:
+            self._build_arrays()
+        short = np.maximum(self._need - self._have[self._req_key], 0.0)
+        short[short < SHORTFALL_TOLERANCE] = 0.0
+        missing = np.bincount(self._req_recipe, weights=short > 0, minlength=len(self._recipe_ids))
+        return short, missing
+
+    def suggestions(self) -> List[dict]:
+        """Suggestion list, rebuilt only after a change to a required stock amount."""
+        with self.lock:
+            if self._suggestions is not None:
+                return self._suggestions
+            import numpy as np
+
+            short, _ = self._shortfalls()
+            # shortfall in the unit the recipe was written in; NaN for count-only requirements
+            gap_positions = np.flatnonzero(short)
+            amounts = np.round(short[gap_positions] / self._factor[gap_positions], 3)
+            gaps: Dict[int, List[Tuple[dict, Optional[float]]]] = defaultdict(list)
+            for j, pos, amount in zip(
+                gap_positions.tolist(), self._req_recipe[gap_positions].tolist(), amounts.tolist()
+            ):
+                gaps[pos].append((self._requirements[j], None if amount != amount else amount))
+
+            suggestions = []
+            for pos, recipe_id in enumerate(self._recipe_ids):
+                recipe = self.recipes[recipe_id]
+                if pos not in gaps:
+                    suggestions.append({
+                        "title": recipe["title"],
+                        "description": recipe["description"],
+                        "ingredients": recipe["ingredients"],
+                    })
+                    continue
+                suggestions.append({
+                    "title": recipe["title"],
+                    "description": recipe["description"],
+                    "missing_ingredients": [req["name"] for req, _ in gaps[pos]],
+                    "shortfall": [
+                        {"name": req["name"], "quantity": amount, "unit": req["unit"]}
+                        for req, amount in gaps[pos]
+                    ],
+                })
+            self._suggestions = suggestions
+            return suggestions
+
+    def shopping_list(self, recipe_ids: Iterable[int]) -> List[dict]:
+        """
+        What to buy to cook all of ``recipe_ids``: their requirements are
+        summed per stock key first and the stock is subtracted once, so two
+        recipes cannot both count the same lot. Amounts are in base units.
+        """
+        with self.lock:
+            needs: Dict[StockKey, dict] = {}
+            for recipe_id in dict.fromkeys(recipe_ids):
+                recipe = self.recipes[recipe_id]
+                for key, requirement in recipe["requirements"].items():
+                    entry = needs.get(key)
+                    if entry is None:
+                        needs[key] = {"name": requirement["name"], "need": requirement["need"], "recipes": []}
+                    elif key[1] != ANY_AMOUNT:
+                        entry["need"] += requirement["need"]
+                    needs[key]["recipes"].append(recipe["title"])
+
+            items = []
+            for (name_norm, unit), entry in sorted(needs.items()):
+                short = entry["need"] - self.stock.get((name_norm, unit), 0.0)
+                if short < SHORTFALL_TOLERANCE:
+                    continue
+                items.append({
+                    "name": entry["name"],
+                    "name_norm": name_norm,
+                    "quantity": None if unit == ANY_AMOUNT else round(short, 3),
+                    "unit": None if unit == ANY_AMOUNT else unit,
+                    "recipes": entry["recipes"],
+                })
+            return items
+
+    def _urgency(self, today: date) -> "np.ndarray":
+        """Per stock key: 1 / (1 + days until its soonest lot expires), 0 for undated stock."""
+        import numpy as np
+
+        urgency = np.zeros(len(self._key_index), dtype=np.float64)
+        for row in self.lots.values():
+            if not row.get("expiration_date"):
+                continue
+            days = (date.fromisoformat(str(row["expiration_date"])) - today).days
+            weight = 1.0 / (1 + max(days, 0))
+            for key, _ in self._lot_amounts(row):
+                position = self._key_index.get(key)
+                if position is not None and weight > urgency[position]:
+                    urgency[position] = weight
+        return urgency
+
+    def ranked_suggestions(self, today: date, limit: Optional[int] = None) -> List[dict]:
+        """
+        Suggestions ordered by how much soon-to-expire stock each recipe uses
+        up: per requirement, the share of the matching stock it consumes times
+        that stock's urgency, minus MISSING_PENALTY per uncovered requirement.
+        Only the best ``limit`` are selected, with a heap.
+        """
+        import numpy as np
+
+        with self.lock:
+            suggestions = self.suggestions()
+            _, missing = self._shortfalls()
+            have = self._have[self._req_key]
+            used_share = np.divide(
+                np.minimum(self._need, have), have, out=np.zeros_like(have), where=have > 0
+            )
+            usage = used_share * self._urgency(today)[self._req_key]
+            scores = (
+                np.bincount(self._req_recipe, weights=usage, minlength=len(self._recipe_ids))
+                - MISSING_PENALTY * missing
+            ).tolist()
+            best = heapq.nlargest(
+                len(scores) if limit is None else limit, range(len(scores)), key=scores.__getitem__
+            )
+            return [{**suggestions[pos], "score": round(scores[pos], 4)} for pos in best]
+
+
+ingredient_indexes = UserIndexRegistry(
+    max_users=INGREDIENT_INDEX_MAX_USERS, ttl=INGREDIENT_INDEX_TTL_SECONDS
+)
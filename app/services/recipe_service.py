@@ -1,57 +1,146 @@
+import asyncio
+import logging
+from datetime import date
+from typing import AsyncIterator, List, Optional, Set
+
+from fastapi import HTTPException
+
+from app.core.cache import LRUCache
+from app.core.config import RECIPE_IMPORT_CHUNK_SIZE, SUGGESTION_CACHE_SIZE, SUGGESTION_CACHE_TTL_SECONDS
 from app.repositories.recipes import RecipeRepository
 from app.repositories.food import FoodRepository
 from app.models.schemas import RecipeCreate
+from app.services.ingredient_index import UserIngredientIndex, ingredient_indexes
+from app.services.user_index import UserIndexRegistry
+
+logger = logging.getLogger(__name__)
+
+# (user_id, data version, day, limit) -> suggestions response
+suggestion_cache = LRUCache(maxsize=SUGGESTION_CACHE_SIZE, ttl=SUGGESTION_CACHE_TTL_SECONDS)
+
+# detached imports are referenced here until they finish, so they are not
+# garbage collected once nobody reads their progress
+_running_imports: Set[asyncio.Task] = set()
+
+
+class RecipeImportError(Exception):
+    """A chunk of a bulk import failed. The chunks before it stay committed."""
+
+    def __init__(self, message: str, imported: int, total: int, recipe_ids: List[int]):
+        super().__init__(message)
+        self.imported = imported
+        self.total = total
+        self.recipe_ids = recipe_ids
+
 
 class RecipeService:
-    def __init__(self, recipe_repo: RecipeRepository, food_repo: FoodRepository):
+    def __init__(
+        self,
+        recipe_repo: RecipeRepository,
+        food_repo: FoodRepository,
+        indexes: UserIndexRegistry = ingredient_indexes,
+        cache: LRUCache = suggestion_cache,
+    ):
         self.recipe_repo = recipe_repo
         self.food_repo = food_repo
+        self.indexes = indexes
+        self.cache = cache
 
-    def save_recipe(self, user_id: int, payload: RecipeCreate):
-        recipe = self.recipe_repo.create_recipe(user_id, payload)
+    async def save_recipe(self, user_id: int, payload: RecipeCreate):
+        recipe = await self.recipe_repo.save_recipe(user_id, payload)
         if not recipe:
-            from fastapi import HTTPException
             raise HTTPException(status_code=400, detail="Error creating recipe")
 
-        ing_data = self.recipe_repo.add_ingredients(recipe["id"], payload.ingredients)
-        return {"message": "Recipe saved", "recipe": recipe, "ingredients": ing_data}
-
-    def compute_recipe_suggestions(self, user_id: int):
-        user_food_items = {
-            item["name_norm"]: item for item in self.food_repo.get_all_food_items(user_id)
-        }
-
-        recipes = self.recipe_repo.get_recipes_for_user(user_id)
-        if not recipes:
-            return {"suggestions": []}
-
-        suggestions = []
-
-        for recipe in recipes:
-            ingredients = self.recipe_repo.get_ingredients_for_recipe(recipe["id"])
-            if not ingredients:
-                continue
-
-            missing = []
-            can_make = True
-
-            for ing in ingredients:
-                name_norm = ing["name_norm"]
-                if name_norm not in user_food_items:
-                    missing.append(ing["name"])
-                    can_make = False
-
-            if can_make:
-                suggestions.append({
-                    "title": recipe["title"],
-                    "description": recipe["description"],
-                    "ingredients": [i["name"] for i in ingredients],
-                })
-            elif missing:
-                suggestions.append({
-                    "title": recipe["title"],
-                    "description": recipe["description"],
-                    "missing_ingredients": missing,
-                })
-
-        return {"suggestions": suggestions}
+        ingredients = recipe.pop("ingredients", None) or []
+        self.indexes.recipe_saved(user_id, recipe, ingredients)
+        return {"message": "Recipe saved", "recipe": recipe, "ingredients": ingredients}
+
+    async def import_recipes(
+        self, user_id: int, payloads: List[RecipeCreate], chunk_size: int = RECIPE_IMPORT_CHUNK_SIZE
+    ) -> AsyncIterator[dict]:
+        """
+        Imports ``payloads`` in chunks of ``chunk_size`` recipes, one
+        transactional call per chunk, and yields the progress after each one.
+        If a chunk fails, RecipeImportError is raised with the ids committed
+        by the chunks before it.
+        """
+        imported, recipe_ids = 0, []
+        for start in range(0, len(payloads), chunk_size):
+            try:
+                recipes = await self.recipe_repo.import_recipes(user_id, payloads[start:start + chunk_size])
+            except Exception as exc:
+                # a timeout or a short result can leave the chunk committed
+                # without us knowing its rows, so the warm index is dropped
+                self.indexes.invalidate(user_id)
+                raise RecipeImportError(
+                    f"Import failed after {imported} of {len(payloads)} recipes: {exc}",
+                    imported, len(payloads), recipe_ids,
+                ) from exc
+            for recipe in recipes:
+                self.indexes.recipe_saved(user_id, recipe, recipe.pop("ingredients", None) or [])
+            imported += len(recipes)
+            chunk_ids = [r["id"] for r in recipes]
+            recipe_ids.extend(chunk_ids)
+            yield {"imported": imported, "total": len(payloads), "recipe_ids": chunk_ids}
+
+    def import_recipes_detached(
+        self, user_id: int, payloads: List[RecipeCreate], chunk_size: int = RECIPE_IMPORT_CHUNK_SIZE
+    ) -> "asyncio.Queue[Optional[dict]]":
+        """
+        Runs ``import_recipes`` in a task of its own, so the import finishes
+        even if the client reading its progress disconnects. The returned
+        queue gets each progress dict, then an ``error`` dict if a chunk
+        failed, then None.
+        """
+        queue: "asyncio.Queue[Optional[dict]]" = asyncio.Queue()
+
+        async def run():
+            try:
+                async for progress in self.import_recipes(user_id, payloads, chunk_size):
+                    queue.put_nowait(progress)
+            except RecipeImportError as exc:
+                logger.warning("Recipe import for user %s failed: %s", user_id, exc)
+                queue.put_nowait({"error": str(exc), "imported": exc.imported, "total": exc.total})
+            finally:
+                queue.put_nowait(None)
+
+        task = asyncio.create_task(run())
+        _running_imports.add(task)
+        task.add_done_callback(_running_imports.discard)
+        return queue
+
+    async def _get_index(self, user_id: int) -> UserIngredientIndex:
+        index = self.indexes.get(user_id)
+        if index is None:
+            version = self.indexes.begin_build(user_id)
+            food_items, recipes = await asyncio.gather(
+                self.food_repo.get_all_food_items(user_id),
+                self.recipe_repo.get_recipes_with_ingredients(user_id),
+            )
+            index = UserIngredientIndex(recipes, food_items)
+            self.indexes.install(user_id, index, version)
+        return index
+
+    async def compute_recipe_suggestions(self, user_id: int, limit: Optional[int] = None):
+        today = date.today()
+        key = (user_id, self.indexes.versions.get(user_id), today, limit)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        index = await self._get_index(user_id)
+        result = {"suggestions": index.ranked_suggestions(today, limit)}
+        self.cache.set(key, result)
+        return result
+
+    async def shopping_list(self, user_id: int, recipe_ids: List[int]):
+        index = await self._get_index(user_id)
+        unknown = [rid for rid in dict.fromkeys(recipe_ids) if rid not in index.recipes]
+        if unknown:
+            # The warm index may predate a recipe written elsewhere; rebuild once before a 404.
+            self.indexes.invalidate(user_id)
+            index = await self._get_index(user_id)
+            unknown = [rid for rid in unknown if rid not in index.recipes]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Recipes not found: {', '.join(map(str, unknown))}")
+        return {"items": index.shopping_list(recipe_ids)}
@@ -0,0 +1,40 @@
+import math
+from typing import Optional, Tuple
+
+# unit -> (base unit, factor to the base unit)
+UNIT_CONVERSIONS = {
+    "mg": ("g", 0.001),
+    "g": ("g", 1.0),
+    "kg": ("g", 1000.0),
+    "ml": ("ml", 1.0),
+    "cl": ("ml", 10.0),
+    "dl": ("ml", 100.0),
+    "l": ("ml", 1000.0),
+    "pcs": ("pcs", 1.0),
+    "pc": ("pcs", 1.0),
+    "stk": ("pcs", 1.0),
+    "stück": ("pcs", 1.0),
+}
+
+
+def base_unit(unit: Optional[str]) -> Tuple[str, float]:
+    """
+    Base unit and conversion factor for ``unit``. Units without an entry in
+    UNIT_CONVERSIONS are only comparable with themselves; a missing unit
+    counts as pieces.
+    """
+    key = (unit or "").strip().lower()
+    if not key:
+        return "pcs", 1.0
+    return UNIT_CONVERSIONS.get(key, (key, 1.0))
+
+
+def parse_quantity(value) -> Optional[float]:
+    """Numeric value of a quantity column (``recipe_ingredients.quantity`` is text)."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value) if isinstance(value, (int, float)) else float(str(value).strip().replace(",", "."))
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+from app.services.data_version import DataVersions, data_versions
+
+
+class UserIndexRegistry:
+    """
+    Holds the warm per-user indexes of this process, least recently used
+    first out. Every write notification bumps the user's data version, so an
+    index built from a read that raced a write is never installed.
+    Indexes are rebuilt after ``ttl`` seconds to pick up writes made by
+    other worker processes.
+    """
+
+    def __init__(
+        self,
+        versions: DataVersions = data_versions,
+        max_users: int = 10000,
+        ttl: float = 300,
+    ):
+        self.versions = versions
+        self.max_users = max_users
+        self.ttl = ttl
+        self._indexes: "OrderedDict[int, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Any]:
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                return None
+            if time.monotonic() - index.built_at > self.ttl:
+                del self._indexes[user_id]
+                return None
+            self._indexes.move_to_end(user_id)
+            return index
+
+    def begin_build(self, user_id: int) -> int:
+        return self.versions.get(user_id)
+
+    def install(self, user_id: int, index: Any, version: int) -> bool:
+        with self._lock:
+            if self.versions.get(user_id) != version:
+                return False
+            self._indexes[user_id] = index
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+            return True
+
+    def _touch(self, user_id: int) -> Optional[Any]:
+        with self._lock:
+            self.versions.bump(user_id)
+            return self._indexes.get(user_id)
+
+    def recipe_saved(self, user_id: int, recipe: dict, ingredients: List[dict]):
+        index = self._touch(user_id)
+        if index is not None:
+            index.add_recipe(recipe, ingredients)
+
+    def lot_saved(self, user_id: int, row: dict):
+        index = self._touch(user_id)
+        if index is not None:
+            index.add_lot(row)
+
+    def lot_removed(self, user_id: int, row: dict):
+        index = self._touch(user_id)
+        if index is not None:
+            index.remove_lot(row)
+
+    def stock_cleared(self, user_id: int):
+        index = self._touch(user_id)
+        if index is not None:
+            index.clear_stock()
+
+    def invalidate(self, user_id: int):
+        """Drops the user's index, for writes whose resulting rows are not known."""
+        with self._lock:
+            self.versions.bump(user_id)
+            self._indexes.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
@@ -1,23 +1,32 @@
 from fastapi import HTTPException
-from app.core.security import verify_password, create_access_token
+from app.core.rate_limit import LoginThrottle, login_throttle
+from app.core.security import password_hasher, password_needs_rehash, create_access_token
 from app.models.schemas import UserCreate, UserLogin
 from app.repositories.users import UserRepository
 
 class UserService:
-    def __init__(self, user_repo: UserRepository):
+    def __init__(self, user_repo: UserRepository, throttle: LoginThrottle = login_throttle):
         self.user_repo = user_repo
+        self.throttle = throttle
 
-    def create_user(self, user: UserCreate):
-        if self.user_repo.get_user_by_username(user.username):
+    async def create_user(self, user: UserCreate):
+        if await self.user_repo.get_user_by_username(user.username):
             raise HTTPException(status_code=409, detail="Username already exists")
-        data = self.user_repo.create_user(user)
+        data = await self.user_repo.create_user(user)
         if not data:
             raise HTTPException(status_code=500, detail="Error creating user")
         return data
 
-    def login(self, payload: UserLogin):
-        user_record = self.user_repo.get_user_by_username(payload.username)
-        if not user_record or not verify_password(payload.password, user_record["password_hash"]):
+    async def login(self, payload: UserLogin, client_ip: str = "unknown"):
+        # throttled before the user lookup and the bcrypt check
+        self.throttle.check(payload.username, client_ip)
+        user_record = await self.user_repo.get_user_by_username(payload.username)
+        if user_record:
+            self.throttle.user_found(payload.username)
+        if not user_record or not await password_hasher.verify(payload.password, user_record["password_hash"]):
             raise HTTPException(status_code=401, detail="Invalid username or password")
+        if password_needs_rehash(user_record["password_hash"]):
+            new_hash = await password_hasher.hash(payload.password)
+            await self.user_repo.update_password_hash(user_record["id"], new_hash)
         token = create_access_token({"user_id": user_record["id"]})
         return token
@@ -1,2 +1,33 @@
+import base64
+import json
+from datetime import date
+from typing import Optional, Tuple
+
+from app.services.canonical_names import canonical_name
+
+
 def normalize_name(s: str) -> str:
-    return s.strip().lower()
+    return canonical_name(s)
+
+
+def escape_like(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def encode_cursor(expiration_date: Optional[str], row_id: int) -> str:
+    raw = json.dumps([expiration_date, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], int]:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        expiration_date, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception as exc:
+        raise ValueError("Malformed cursor") from exc
+    if not isinstance(row_id, int) or not (expiration_date is None or isinstance(expiration_date, str)):
+        raise ValueError("Malformed cursor")
+    if expiration_date is not None:
+        date.fromisoformat(expiration_date)
+    return expiration_date, row_id
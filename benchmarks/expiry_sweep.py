@@ -0,0 +1,92 @@
+"""
+Cost of the expiry sweeper's full scan, reported per 100k lots: database
+round trips, the sweeper's own processing time (parsing rows, heap build,
+first release), time to release a day's worth of lots into digests, and
+peak memory. Time spent inside the in-memory stand-in is reported
+separately since it says nothing about Postgres.
+
+    python -m benchmarks.expiry_sweep --lots 100000 --users 1000
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from app.core.config import POSTGREST_MAX_ROWS
+from app.db.memory import InMemoryClient
+from app.repositories.food import FoodRepository
+from app.services.expiry_sweeper import ExpirySweeper
+
+
+def build_client(n_lots: int, n_users: int, today: date) -> InMemoryClient:
+    rng = random.Random(42)
+    client = InMemoryClient(max_rows=POSTGREST_MAX_ROWS)
+    client.insert_rows("food_stock", [
+        {
+            "user_id": rng.randrange(n_users), "name": f"Item {i}", "name_norm": f"item {i}",
+            "quantity": 1.0, "unit": "pcs",
+            "expiration_date": str(today + timedelta(days=rng.randrange(-30, 365))),
+        }
+        for i in range(n_lots)
+    ])
+    return client
+
+
+class TimedFoodRepository(FoodRepository):
+    """Separates time spent answering queries from the sweeper's own work."""
+
+    db_seconds = 0.0
+
+    async def get_expiration_page(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await super().get_expiration_page(*args, **kwargs)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lots", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=POSTGREST_MAX_ROWS,
+                        help="capped at POSTGREST_MAX_ROWS, like the sweeper's own setting")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    today = [date.today()]
+    client = build_client(args.lots, args.users, today[0])
+    client.latency = args.latency_ms / 1000
+    sweeper = ExpirySweeper(page_size=args.page_size, today=lambda: today[0])
+
+    repo = TimedFoodRepository(client)
+    start = time.perf_counter()
+    asyncio.run(sweeper.scan(repo))
+    scan_seconds = time.perf_counter() - start
+
+    # second scan only to measure memory; tracemalloc distorts timings
+    tracemalloc.start()
+    asyncio.run(ExpirySweeper(page_size=args.page_size, today=lambda: today[0]).scan(FoodRepository(client)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    today[0] += timedelta(days=1)
+    start = time.perf_counter()
+    sweeper.release_due()
+    release_ms = (time.perf_counter() - start) * 1000
+
+    scale = 100_000 / max(sweeper.last_scan["lots"], 1)
+    print(f"lots scanned:          {sweeper.last_scan['lots']} (of {args.lots}, rest already expired)")
+    print(f"round trips:           {client.round_trips // 2} (page size {sweeper.page_size}, {args.latency_ms} ms each)")
+    sweeper_seconds = scan_seconds - repo.db_seconds
+    print(f"scan wall time:        {scan_seconds:.2f} s (in-memory database: {repo.db_seconds:.2f} s)")
+    print(f"sweeper processing:    {sweeper_seconds:.2f} s  ->  {sweeper_seconds * scale:.2f} s per 100k lots")
+    print(f"peak memory during scan: {peak / 2**20:.1f} MiB  ->  {peak * scale / 2**20:.1f} MiB per 100k lots")
+    print(f"next-day release:      {release_ms:.2f} ms")
+    print(f"users with a digest:   {sweeper.stats()['users_with_digest']}")
+
+
+if __name__ == "__main__":
+    main()
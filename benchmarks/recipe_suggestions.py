@@ -0,0 +1,107 @@
+"""
+Latency of /users/{user_id}/recipes/suggest as the recipe book grows,
+comparing the old per-recipe ingredient fetch (N+1 round trips) with the
+joined fetch used by RecipeService, cold (index built from the database),
+warm (computed from the in-process ingredient index, with the response
+cache disabled) and cached (a hit in the suggestion response cache).
+
+    python -m benchmarks.recipe_suggestions --latency-ms 2
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+
+from app.core.cache import LRUCache
+from app.db.memory import InMemoryClient
+from app.repositories.food import FoodRepository
+from app.repositories.recipes import RecipeRepository
+from app.services.data_version import DataVersions
+from app.services.user_index import UserIndexRegistry
+from app.services.recipe_service import RecipeService
+
+INGREDIENTS = ["pasta", "tomato", "onion", "garlic", "olive oil", "basil", "rice", "carrot"]
+
+
+def build_client(n_recipes: int, latency: float) -> InMemoryClient:
+    client = InMemoryClient()
+    today = date.today()
+    client.insert_rows("food_stock", [
+        {
+            "user_id": 1, "name": name.title(), "name_norm": name,
+            "quantity": 1, "unit": "pcs", "expiration_date": str(today + timedelta(days=i)),
+        }
+        for i, name in enumerate(INGREDIENTS[:5])
+    ])
+    for r in range(n_recipes):
+        recipe = client.insert_rows("recipes", {"user_id": 1, "title": f"Recipe {r}", "description": ""})[0]
+        client.insert_rows("recipe_ingredients", [
+            {"recipe_id": recipe["id"], "name": name.title(), "name_norm": name, "quantity": "1", "unit": "pcs"}
+            for name in INGREDIENTS[r % 4: r % 4 + 4]
+        ])
+    client.latency = latency
+    return client
+
+
+async def legacy_suggestions(recipe_repo: RecipeRepository, food_repo: FoodRepository, user_id: int):
+    stock = {item["name_norm"] for item in await food_repo.get_all_food_items(user_id)}
+    suggestions = []
+    for recipe in await recipe_repo.get_recipes_for_user(user_id):
+        ingredients = await recipe_repo.get_ingredients_for_recipe(recipe["id"])
+        missing = [i["name"] for i in ingredients if i["name_norm"] not in stock]
+        suggestions.append({"title": recipe["title"], "missing_ingredients": missing})
+    return {"suggestions": suggestions}
+
+
+async def measure(fn, client: InMemoryClient, repeat: int):
+    client.round_trips = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+    return elapsed_ms, client.round_trips // repeat
+
+
+async def run(args):
+    print(f"simulated round-trip latency: {args.latency_ms} ms")
+    print(
+        f"{'recipes':>8} | {'before ms':>10} {'trips':>6} | {'cold ms':>9} {'trips':>6}"
+        f" | {'warm ms':>9} {'trips':>6} | {'cached ms':>9} {'trips':>6}"
+    )
+    for n in args.sizes:
+        client = build_client(n, args.latency_ms / 1000)
+        recipe_repo, food_repo = RecipeRepository(client), FoodRepository(client)
+
+        def service(indexes: UserIndexRegistry, cache_size: int) -> RecipeService:
+            # a size-0 cache never hits, so every call goes through the index
+            return RecipeService(recipe_repo, food_repo, indexes, LRUCache(maxsize=cache_size))
+
+        warm_service = service(UserIndexRegistry(DataVersions()), 0)
+        await warm_service.compute_recipe_suggestions(1)
+        cached_service = service(UserIndexRegistry(DataVersions()), 1)
+        await cached_service.compute_recipe_suggestions(1)
+
+        before = await measure(lambda: legacy_suggestions(recipe_repo, food_repo, 1), client, args.repeat)
+        cold = await measure(
+            lambda: service(UserIndexRegistry(DataVersions()), 0).compute_recipe_suggestions(1), client, args.repeat
+        )
+        warm = await measure(lambda: warm_service.compute_recipe_suggestions(1), client, args.repeat * 100)
+        cached = await measure(lambda: cached_service.compute_recipe_suggestions(1), client, args.repeat * 100)
+        print(
+            f"{n:>8} | {before[0]:>10.1f} {before[1]:>6} | {cold[0]:>9.1f} {cold[1]:>6}"
+            f" | {warm[0]:>9.3f} {warm[1]:>6} | {cached[0]:>9.3f} {cached[1]:>6}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 300])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
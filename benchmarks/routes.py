@@ -0,0 +1,228 @@
+"""
+Runs every route of main.app in-process against the in-memory backend at
+several data sizes generated by seed.generate, and reports p50/p95/p99
+latency and PostgREST round trips per request. Results are written as JSON
+so two runs can be diffed.
+
+    python -m benchmarks.routes --sizes small,medium --requests 100 --output routes.json
+"""
+import os
+
+os.environ.setdefault("SUPABASE_BACKEND", "memory")
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+import numpy as np
+from fastapi.routing import APIRoute
+
+from app.core.config import get_settings
+from app.core.rate_limit import login_throttle
+from app.core.security import create_access_token, token_cache
+from app.db import supabase as supabase_db
+from app.db.memory import InMemoryClient
+from app.repositories.food import FoodRepository
+from app.services.expiry_index import expiry_indexes
+from app.services.expiry_sweeper import expiry_sweeper
+from app.services.ingredient_index import ingredient_indexes
+from app.services.recipe_service import suggestion_cache
+from main import app
+from seed.generate import generate
+
+SIZES = {
+    "small": dict(users=10, lots_per_user=50, recipes_per_user=20, ingredients_per_recipe=5),
+    "medium": dict(users=50, lots_per_user=200, recipes_per_user=100, ingredients_per_recipe=6),
+    "large": dict(users=100, lots_per_user=1000, recipes_per_user=500, ingredients_per_recipe=8),
+}
+
+FOOD_ITEM = {"name": "Bench Tomato", "quantity": 1, "unit": "pcs", "expiration_date": str(date.today() + timedelta(days=4))}
+RECIPE = {
+    "title": "Bench Salad",
+    "description": "",
+    "ingredients": [dict(FOOD_ITEM, name=n) for n in ("Tomato", "Cucumber", "Olive Oil")],
+}
+
+
+class Context:
+    def __init__(self, db: InMemoryClient, user_ids: List[int]):
+        self.db = db
+        self.user_ids = user_ids
+        self.tokens = {uid: create_access_token({"user_id": uid}) for uid in user_ids}
+        # lots handed out to the destructive routes, one per request
+        self.spare_lots = [r["id"] for uid in user_ids for r in db.lookup("food_stock", "user_id", uid)]
+
+    def user(self, i: int) -> int:
+        return self.user_ids[i % len(self.user_ids)]
+
+    def auth(self, uid: int) -> dict:
+        return {"headers": {"Authorization": f"Bearer {self.tokens[uid]}"}}
+
+    def any_lot(self, i: int) -> Tuple[int, int]:
+        uid = self.user(i)
+        rows = self.db.lookup("food_stock", "user_id", uid)
+        return uid, rows[i % len(rows)]["id"] if rows else 0
+
+    def take_lot(self) -> Tuple[int, int]:
+        item_id = self.spare_lots.pop()
+        return self.db.lookup("food_stock", "id", item_id)[0]["user_id"], item_id
+
+
+def _user_route(path: str, **kwargs) -> Callable:
+    def build(ctx: Context, i: int):
+        uid = ctx.user(i)
+        return path.format(user_id=uid), {**ctx.auth(uid), **kwargs}
+    return build
+
+
+def _item_route(path: str, take: bool = False, **kwargs) -> Callable:
+    def build(ctx: Context, i: int):
+        uid, item_id = ctx.take_lot() if take else ctx.any_lot(i)
+        return path.format(user_id=uid, item_id=item_id), {**ctx.auth(uid), **kwargs}
+    return build
+
+
+def _new_user(ctx: Context, i: int):
+    return "/users/", {"json": {"username": f"bench{time.time_ns()}", "email": "bench@example.com", "password": "pw"}}
+
+
+def _login(ctx: Context, i: int):
+    return "/login/", {"json": {"username": f"load{i % len(ctx.user_ids):06d}", "password": "password"}}
+
+
+def _shopping_list(ctx: Context, i: int):
+    uid = ctx.user(i)
+    recipe_ids = [r["id"] for r in ctx.db.lookup("recipes", "user_id", uid)[:10]]
+    return f"/users/{uid}/shopping-list", {**ctx.auth(uid), "json": {"recipe_ids": recipe_ids}}
+
+
+# (method, route path) -> request builder; destructive routes come last
+SCENARIOS: Dict[Tuple[str, str], Callable] = {
+    ("POST", "/users/"): _new_user,
+    ("POST", "/login/"): _login,
+    ("GET", "/users/{user_id}/food"): _user_route("/users/{user_id}/food"),
+    ("GET", "/users/{user_id}/food/expiring"): _user_route("/users/{user_id}/food/expiring", params={"days": 7}),
+    ("GET", "/users/{user_id}/food/expiring/digest"): _user_route("/users/{user_id}/food/expiring/digest"),
+    ("GET", "/users/{user_id}/food/{item_id}"): _item_route("/users/{user_id}/food/{item_id}"),
+    ("GET", "/users/{user_id}/recipes/suggest"): _user_route("/users/{user_id}/recipes/suggest", params={"limit": 10}),
+    ("GET", "/users/{user_id}/export"): _user_route("/users/{user_id}/export"),
+    ("GET", "/metrics"): lambda ctx, i: ("/metrics", {}),
+    ("GET", "/metrics/cache"): lambda ctx, i: ("/metrics/cache", {}),
+    ("GET", "/metrics/password-hashing"): lambda ctx, i: ("/metrics/password-hashing", {}),
+    ("GET", "/metrics/expiry-sweeper"): lambda ctx, i: ("/metrics/expiry-sweeper", {}),
+    ("GET", "/metrics/db-pool"): lambda ctx, i: ("/metrics/db-pool", {}),
+    ("GET", "/metrics/login-throttle"): lambda ctx, i: ("/metrics/login-throttle", {}),
+    ("POST", "/users/{user_id}/food"): _user_route("/users/{user_id}/food", json=FOOD_ITEM),
+    ("POST", "/users/{user_id}/food/bulk"): _user_route("/users/{user_id}/food/bulk", json=[FOOD_ITEM] * 20),
+    ("POST", "/users/{user_id}/shopping-list"): _shopping_list,
+    ("POST", "/users/{user_id}/recipes"): _user_route("/users/{user_id}/recipes", json=RECIPE),
+    ("POST", "/users/{user_id}/recipes/bulk"): _user_route("/users/{user_id}/recipes/bulk", json=[RECIPE] * 50),
+    ("POST", "/users/{user_id}/food/{item_id}/consume"): _item_route(
+        "/users/{user_id}/food/{item_id}/consume", json={"quantity": 0.001}
+    ),
+    ("DELETE", "/users/{user_id}/food/{item_id}"): _item_route("/users/{user_id}/food/{item_id}", take=True),
+    ("DELETE", "/users/{user_id}/food"): _user_route("/users/{user_id}/food"),
+}
+# bcrypt-bound routes get fewer requests; all logins come from one client
+# address, so more than LOGIN_IP_BURST of them are throttled with 429
+AUTH_ROUTES = {("POST", "/users/"), ("POST", "/login/")}
+
+
+def app_routes() -> set:
+    return {
+        (method, route.path)
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+
+
+def summarize(latencies: List[float], round_trips: List[int], errors: int) -> dict:
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "round_trips_per_request": round(sum(round_trips) / len(round_trips), 2),
+    }
+
+
+async def run_size(name: str, params: dict, n_requests: int, n_auth_requests: int, latency: float) -> dict:
+    db = InMemoryClient()
+    started = time.perf_counter()
+    counts = await generate(db, **params)
+    generate_seconds = time.perf_counter() - started
+    ctx = Context(db, counts.pop("user_ids"))
+
+    supabase_db._supabase_client = db
+    for cache in (ingredient_indexes, expiry_indexes, suggestion_cache, token_cache, login_throttle):
+        cache.clear()
+    db.latency = latency
+
+    routes = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        if get_settings().expiry_sweeper_enabled:
+            await expiry_sweeper.scan(FoodRepository(db))  # the digest route needs a finished scan
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            for (method, path), build in SCENARIOS.items():
+                latencies, round_trips, errors = [], [], 0
+                count = n_auth_requests if (method, path) in AUTH_ROUTES else n_requests
+                for i in range(count):
+                    url, kwargs = build(ctx, i)
+                    before = db.round_trips
+                    start = time.perf_counter()
+                    response = await http.request(method, url, **kwargs)
+                    latencies.append(time.perf_counter() - start)
+                    round_trips.append(db.round_trips - before)
+                    errors += response.status_code >= 400
+                routes[f"{method} {path}"] = summarize(latencies, round_trips, errors)
+                print(f"  {method:6} {path:45} {routes[f'{method} {path}']}")
+
+    return {
+        "name": name,
+        **params,
+        "rows": counts,
+        "generate_seconds": round(generate_seconds, 3),
+        "routes": routes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="small,medium", help=f"comma-separated, from {', '.join(SIZES)}")
+    parser.add_argument("--requests", type=int, default=100, help="requests per route")
+    parser.add_argument("--auth-requests", type=int, default=5, help="requests per bcrypt-bound route")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated latency per round trip")
+    parser.add_argument("--output", default="routes-benchmark.json")
+    args = parser.parse_args()
+
+    missing = app_routes() - set(SCENARIOS)
+    if missing:
+        print(f"not benchmarked: {sorted(missing)}")
+
+    sizes = []
+    for name in args.sizes.split(","):
+        print(f"{name}: {SIZES[name]}")
+        sizes.append(asyncio.run(
+            run_size(name, SIZES[name], args.requests, args.auth_requests, args.latency_ms / 1000)
+        ))
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "generated_at": datetime.utcnow().isoformat(),
+            "requests_per_route": args.requests,
+            "latency_ms": args.latency_ms,
+            "sizes": sizes,
+        }, f, indent=2)
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
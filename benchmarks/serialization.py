@@ -0,0 +1,93 @@
+"""
+Serialisation cost of large responses, per strategy: FastAPI's default
+for a plain dict (``jsonable_encoder`` + stdlib ``json``), a declared
+response model (pydantic validates the rows again, then dumps them) and
+the ORJSONResponse the routes return. Payloads are food-list pages and
+suggestion lists of ``--rows`` entries.
+
+    python -m benchmarks.serialization --rows 10000 --repeat 20
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.responses import ORJSONResponse
+from app.models.schemas import FoodItemPage, RecipeSuggestions
+from seed.generate import FOODS
+
+
+def food_page(n_rows: int) -> dict:
+    rng = random.Random(42)
+    today = date.today()
+    items = []
+    for i in range(n_rows):
+        name, unit, (low, high) = rng.choice(FOODS)
+        items.append({
+            "id": i + 1, "user_id": 1, "name": name, "name_norm": name.lower(),
+            "quantity": float(rng.randint(low, high)), "unit": unit,
+            "expiration_date": today + timedelta(days=rng.randint(-3, 60)),
+        })
+    return {"items": items, "next_cursor": "MjAyNi0wMS0wMXwxMjM0"}
+
+
+def suggestions(n_rows: int) -> dict:
+    rng = random.Random(42)
+    result = []
+    for i in range(n_rows):
+        foods = [f[0] for f in rng.sample(FOODS, 6)]
+        if i % 3:
+            result.append({
+                "title": f"{foods[0]} Soup #{i}", "description": "Generated recipe",
+                "missing_ingredients": foods[:2],
+                "shortfall": [{"name": f, "quantity": float(rng.randint(1, 500)), "unit": "g"} for f in foods[:2]],
+                "score": round(rng.uniform(-2, 3), 4),
+            })
+        else:
+            result.append({
+                "title": f"{foods[0]} Salad #{i}", "description": "Generated recipe",
+                "ingredients": foods, "score": round(rng.uniform(0, 3), 4),
+            })
+    return {"suggestions": result}
+
+
+def strategies(model) -> Dict[str, Callable[[dict], bytes]]:
+    adapter = TypeAdapter(model)
+    return {
+        "jsonable_encoder+json": lambda payload: JSONResponse(jsonable_encoder(payload)).body,
+        "response_model": lambda payload: adapter.dump_json(adapter.validate_python(payload)),
+        "orjson": lambda payload: ORJSONResponse(payload).body,
+    }
+
+
+def measure(render: Callable[[dict], bytes], payload: dict, repeat: int) -> float:
+    render(payload)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        render(payload)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for label, payload, model in (
+        ("food page", food_page(args.rows), FoodItemPage),
+        ("suggestions", suggestions(args.rows), RecipeSuggestions),
+    ):
+        print(f"{label}, {args.rows} rows")
+        for name, render in strategies(model).items():
+            ms = measure(render, payload, args.repeat)
+            print(f"  {name:24} {ms:8.2f} ms  ({len(render(payload)) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
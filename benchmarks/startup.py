@@ -0,0 +1,149 @@
+"""
+Cold start of a fresh interpreter: ``python -X importtime`` for the import
+of main, and time-to-first-request, i.e. from spawning the process until
+the lifespan has run and the first request has been answered. Each run is
+a new process against the in-memory backend. Exits non-zero when the
+median time-to-first-request is over ``--budget-ms``.
+
+    python -m benchmarks.startup --runs 5 --budget-ms 1500 --output startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import List, Tuple
+
+FIRST_REQUEST_PATH = "/metrics/cache"
+
+
+def _env() -> dict:
+    return {**os.environ, "SUPABASE_BACKEND": "memory"}
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, nesting depth, cumulative us) for every line ``-X importtime`` wrote."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), depth, int(cumulative_us)))
+    return modules
+
+
+def importtime(top: int) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=_env(), capture_output=True, text=True, check=True,
+    )
+    modules = parse_importtime(proc.stderr)
+    # children are printed before their parent, so main's subtree is the run
+    # of nested lines right before it
+    end = next(i for i, (name, depth, _) in enumerate(modules) if name == "main" and depth == 0)
+    start = end
+    while start > 0 and modules[start - 1][1] > 0:
+        start -= 1
+    main_us = modules[end][2]
+    direct = [(name, cumulative) for name, depth, cumulative in modules[start:end] if depth == 1]
+    heaviest = sorted(direct, key=lambda m: -m[1])[:top]
+    return {
+        "import_main_ms": round(main_us / 1000, 1),
+        "modules": end - start + 1,
+        "heaviest": [{"module": n, "cumulative_ms": round(c / 1000, 1)} for n, c in heaviest],
+    }
+
+
+async def _first_request(app, path: str) -> int:
+    """A single GET straight through the ASGI interface, so no HTTP client is imported."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [],
+        "client": ("127.0.0.1", 0), "server": ("startup", 80),
+    }
+    async with app.router.lifespan_context(app):
+        await app(scope, receive, send)
+    return messages[0]["status"]
+
+
+def _child():
+    started = time.perf_counter()
+    from main import app
+    imported = time.perf_counter()
+    status = asyncio.run(_first_request(app, FIRST_REQUEST_PATH))
+    print(json.dumps({
+        "status": status,
+        "import_ms": (imported - started) * 1000,
+        "lifespan_and_request_ms": (time.perf_counter() - imported) * 1000,
+    }))
+
+
+def time_to_first_request() -> dict:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        env=_env(), capture_output=True, text=True, check=True,
+    )
+    total_ms = (time.perf_counter() - started) * 1000
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if result["status"] != 200:
+        raise RuntimeError(f"first request answered {result['status']}")
+    return {"time_to_first_request_ms": total_ms, **result}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="median time-to-first-request budget")
+    parser.add_argument("--top", type=int, default=10, help="heaviest direct imports of main to report")
+    parser.add_argument("--output", default="startup-benchmark.json")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child()
+        return
+
+    imports = importtime(args.top)
+    print(f"import main: {imports['import_main_ms']} ms over {imports['modules']} modules")
+    for module in imports["heaviest"]:
+        print(f"  {module['module']:40} {module['cumulative_ms']:8.1f} ms")
+
+    runs = [time_to_first_request() for _ in range(args.runs)]
+    summary = {
+        key: round(statistics.median(run[key] for run in runs), 1)
+        for key in ("time_to_first_request_ms", "import_ms", "lifespan_and_request_ms")
+    }
+    print(f"median over {args.runs} runs: {summary}")
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "generated_at": datetime.utcnow().isoformat(),
+            "budget_ms": args.budget_ms,
+            "importtime": imports,
+            "median": summary,
+            "runs": runs,
+        }, f, indent=2)
+    print(f"wrote {args.output}")
+
+    if summary["time_to_first_request_ms"] > args.budget_ms:
+        print(f"time-to-first-request {summary['time_to_first_request_ms']} ms is over the {args.budget_ms} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,46 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.api import auth
-from app.api import recipes, food
+from app.api import recipes, food, metrics, export
+from app.core.config import load_settings, validate_settings
+from app.core.metrics import MetricsMiddleware
+from app.core.responses import ORJSONResponse
+from app.db.supabase import close_supabase_client, get_supabase_client
+from app.repositories.food import FoodRepository
+from app.services.expiry_sweeper import expiry_sweeper
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = load_settings()
+    validate_settings(settings)
+    app.state.settings = settings
+    client = await get_supabase_client()  # the shared HTTP pool is built once, here
+    # request validators are compiled at import; the OpenAPI schema is only
+    # built on first use, so do it now rather than in the first /docs request
+    app.openapi()
+    if settings.expiry_sweeper_enabled:
+        expiry_sweeper.start(FoodRepository(client))
+    yield
+    await expiry_sweeper.stop()
+    await close_supabase_client()
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="WasteLess API", lifespan=lifespan, default_response_class=ORJSONResponse)
+    app.add_middleware(MetricsMiddleware)
 
-app = FastAPI(title="WasteLess API")
+    app.include_router(auth.router)
+    app.include_router(food.router)
+    app.include_router(recipes.router)
+    app.include_router(export.router)
+    app.include_router(metrics.router)
+    return app
 
-app.include_router(auth.router)
-app.include_router(food.router)
-app.include_router(recipes.router)
+def __getattr__(name: str):
+    # "main:app" is built on first access, so "main:create_app --factory"
+    # does not build a second app that is never served
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
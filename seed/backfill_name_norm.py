@@ -0,0 +1,82 @@
+"""
+Recomputes name_norm for existing food_stock and recipe_ingredients rows
+after the canonical-name rules changed. Rows are read in id order, one batch
+at a time, and only rows whose name_norm changes are written back, with one
+RPC call per batch. Food lots that now share a lot key are merged.
+
+    python -m seed.backfill_name_norm [--batch-size N] [--dry-run]
+
+The batch size is capped at POSTGREST_MAX_ROWS.
+"""
+import argparse
+import asyncio
+
+from app.core.config import POSTGREST_MAX_ROWS
+from app.services.utils import normalize_name
+
+# table -> Postgres function writing a batch of {id, name_norm} back
+TABLES = {
+    "food_stock": "set_food_name_norms",
+    "recipe_ingredients": "set_ingredient_name_norms",
+}
+
+
+async def backfill_table(client, table: str, batch_size: int = POSTGREST_MAX_ROWS, dry_run: bool = False) -> dict:
+    # a larger batch would come back short and look like the last one
+    batch_size = min(batch_size, POSTGREST_MAX_ROWS)
+    stats = {"scanned": 0, "changed": 0, "updated": 0, "merged": 0, "batches": 0}
+    after = 0
+    while True:
+        resp = await (
+            client.table(table)
+            .select("id,name,name_norm")
+            .gt("id", after)
+            .order("id", desc=False)
+            .limit(batch_size)
+            .execute()
+        )
+        rows = resp.data or []
+        if not rows:
+            break
+        after = rows[-1]["id"]
+        stats["scanned"] += len(rows)
+        stats["batches"] += 1
+
+        changed = []
+        for row in rows:
+            name_norm = normalize_name(row["name"])
+            if name_norm != row["name_norm"]:
+                changed.append({"id": row["id"], "name_norm": name_norm})
+        stats["changed"] += len(changed)
+        if changed and not dry_run:
+            result = await client.rpc(TABLES[table], {"p_rows": changed}).execute()
+            for counts in result.data or []:
+                stats["updated"] += counts["updated"]
+                stats["merged"] += counts["merged"]
+
+        if len(rows) < batch_size:
+            break
+    return stats
+
+
+async def backfill(client, batch_size: int = POSTGREST_MAX_ROWS, dry_run: bool = False) -> dict:
+    return {table: await backfill_table(client, table, batch_size, dry_run) for table in TABLES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=POSTGREST_MAX_ROWS)
+    parser.add_argument("--dry-run", action="store_true", help="only count the rows that would change")
+    args = parser.parse_args()
+
+    from app.db.supabase import get_supabase_client
+
+    async def run():
+        return await backfill(await get_supabase_client(), args.batch_size, args.dry_run)
+
+    for table, stats in asyncio.run(run()).items():
+        print(f"{table}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
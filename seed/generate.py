@@ -0,0 +1,169 @@
+"""
+Deterministic synthetic data for load tests and benchmarks: the same
+parameters and seed always produce the same users, lots and recipes.
+Every table is written with chunked bulk inserts.
+
+    python -m seed.generate --users 100 --lots 200 --recipes 50 --ingredients 6 --seed 42
+"""
+import argparse
+import asyncio
+import random
+from datetime import date, timedelta
+from typing import List, Optional
+
+from app.core.security import hash_password
+from app.services.utils import normalize_name
+
+# name, unit, (min, max) quantity of a lot or recipe line in that unit
+FOODS = [
+    ("Tomato", "pcs", (1, 8)), ("Onion", "pcs", (1, 6)), ("Garlic", "pcs", (1, 4)),
+    ("Carrot", "pcs", (1, 10)), ("Potato", "g", (200, 2000)), ("Pasta", "g", (100, 1000)),
+    ("Rice", "g", (100, 1000)), ("Flour", "g", (200, 1000)), ("Sugar", "g", (50, 500)),
+    ("Butter", "g", (50, 250)), ("Cheese", "g", (50, 400)), ("Minced Meat", "g", (200, 800)),
+    ("Chicken Breast", "g", (200, 800)), ("Salmon", "g", (150, 500)), ("Spinach", "g", (100, 500)),
+    ("Mushrooms", "g", (100, 500)), ("Bell Pepper", "pcs", (1, 4)), ("Zucchini", "pcs", (1, 3)),
+    ("Cucumber", "pcs", (1, 2)), ("Lettuce", "pcs", (1, 2)), ("Eggs", "pcs", (1, 12)),
+    ("Apples", "pcs", (1, 8)), ("Bananas", "pcs", (1, 6)), ("Lemons", "pcs", (1, 4)),
+    ("Milk", "ml", (100, 1000)), ("Oat Milk", "ml", (100, 1000)), ("Cream", "ml", (100, 400)),
+    ("Yogurt", "g", (150, 500)), ("Olive Oil", "ml", (10, 500)), ("Tomato Sauce", "ml", (100, 700)),
+    ("Chickpeas", "g", (100, 400)), ("Lentils", "g", (100, 500)), ("Beans", "g", (100, 400)),
+    ("Bread", "g", (250, 1000)), ("Tofu", "g", (100, 400)), ("Basil", "g", (5, 50)),
+    ("Parsley", "g", (5, 50)), ("Ginger", "g", (10, 100)), ("Coconut Milk", "ml", (200, 400)),
+    ("Broccoli", "g", (200, 600)),
+]
+DISHES = ["Soup", "Salad", "Bowl", "Stew", "Bake", "Curry", "Stir Fry", "Pasta", "Wrap", "Omelette"]
+# expiration dates are spread over this window around the base date
+EXPIRY_DAYS = (-3, 60)
+
+
+async def _bulk_insert(client, table: str, rows: List[dict], chunk_size: int) -> List[dict]:
+    inserted = []
+    for start in range(0, len(rows), chunk_size):
+        resp = await client.table(table).insert(rows[start:start + chunk_size]).execute()
+        inserted.extend(resp.data or [])
+    return inserted
+
+
+def _lots(rng: random.Random, user_id: int, count: int, today: date) -> List[dict]:
+    slots = len(FOODS) * (EXPIRY_DAYS[1] - EXPIRY_DAYS[0] + 1)
+    if count > slots:
+        raise ValueError(f"At most {slots} distinct lots per user")
+    seen, lots = set(), []
+    while len(lots) < count:
+        name, unit, (low, high) = rng.choice(FOODS)
+        expiration_date = today + timedelta(days=rng.randint(*EXPIRY_DAYS))
+        if (name, expiration_date) in seen:
+            continue  # (user_id, name_norm, unit, expiration_date) is unique
+        seen.add((name, expiration_date))
+        lots.append({
+            "user_id": user_id,
+            "name": name,
+            "name_norm": normalize_name(name),
+            "quantity": float(rng.randint(low, high)),
+            "unit": unit,
+            "expiration_date": str(expiration_date),
+        })
+    return lots
+
+
+async def generate(
+    client,
+    users: int = 10,
+    lots_per_user: int = 50,
+    recipes_per_user: int = 20,
+    ingredients_per_recipe: int = 5,
+    seed: int = 42,
+    today: Optional[date] = None,
+    chunk_size: int = 1000,
+    username_prefix: str = "load",
+    password: str = "password",
+) -> dict:
+    """
+    Writes the data set and returns the row counts and the new user ids.
+    All users share ``password``; it is hashed once.
+    """
+    if ingredients_per_recipe > len(FOODS):
+        raise ValueError(f"At most {len(FOODS)} ingredients per recipe")
+    rng = random.Random(seed)
+    today = today or date.today()
+    password_hash = hash_password(password)
+
+    user_rows = await _bulk_insert(client, "users", [
+        {
+            "username": f"{username_prefix}{i:06d}",
+            "email": f"{username_prefix}{i:06d}@example.com",
+            "password_hash": password_hash,
+        }
+        for i in range(users)
+    ], chunk_size)
+    user_ids = [u["id"] for u in user_rows]
+
+    lots = [lot for user_id in user_ids for lot in _lots(rng, user_id, lots_per_user, today)]
+    await _bulk_insert(client, "food_stock", lots, chunk_size)
+
+    recipes, recipe_foods = [], []
+    for user_id in user_ids:
+        for j in range(recipes_per_user):
+            foods = rng.sample(FOODS, ingredients_per_recipe)
+            recipes.append({
+                "user_id": user_id,
+                "title": f"{foods[0][0]} {rng.choice(DISHES)} #{j + 1}",
+                "description": "Generated recipe",
+            })
+            recipe_foods.append(foods)
+    recipe_rows = await _bulk_insert(client, "recipes", recipes, chunk_size)
+
+    ingredients = [
+        {
+            "recipe_id": recipe["id"],
+            "name": name,
+            "name_norm": normalize_name(name),
+            "quantity": str(rng.randint(low, high)),
+            "unit": unit,
+        }
+        for recipe, foods in zip(recipe_rows, recipe_foods)
+        for name, unit, (low, high) in foods
+    ]
+    await _bulk_insert(client, "recipe_ingredients", ingredients, chunk_size)
+
+    return {
+        "users": len(user_ids),
+        "food_stock": len(lots),
+        "recipes": len(recipe_rows),
+        "recipe_ingredients": len(ingredients),
+        "user_ids": user_ids,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--lots", type=int, default=50, help="lots per user")
+    parser.add_argument("--recipes", type=int, default=20, help="recipes per user")
+    parser.add_argument("--ingredients", type=int, default=5, help="ingredients per recipe")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--prefix", default="load", help="username prefix")
+    args = parser.parse_args()
+
+    from app.db.supabase import get_supabase_client
+
+    async def run():
+        return await generate(
+            await get_supabase_client(),
+            users=args.users,
+            lots_per_user=args.lots,
+            recipes_per_user=args.recipes,
+            ingredients_per_recipe=args.ingredients,
+            seed=args.seed,
+            chunk_size=args.chunk_size,
+            username_prefix=args.prefix,
+        )
+
+    counts = asyncio.run(run())
+    counts.pop("user_ids")
+    print(f"Inserted {counts}")
+
+
+if __name__ == "__main__":
+    main()
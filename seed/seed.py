@@ -4,6 +4,8 @@ from supabase import create_client, Client
 import os
 import bcrypt
 
+from app.services.utils import normalize_name
+
 load_dotenv()
 url = os.environ.get("SUPABASE_URL")
 key = os.environ.get("SUPABASE_KEY")
@@ -30,25 +32,25 @@ def seed():
     today = date.today()
     # Stock for Alice
     foods = [
-        {"user_id": u1["id"], "name": "Tomato", "name_norm": "tomato", "quantity": 4, "unit": "pcs", "expiration_date": str(today + timedelta(days=3))},
-        {"user_id": u1["id"], "name": "Pasta", "name_norm": "pasta", "quantity": 500, "unit": "g", "expiration_date": str(today + timedelta(days=180))},
-        {"user_id": u1["id"], "name": "Cashew Nuts", "name_norm": "cashew nuts", "quantity": 200, "unit": "g", "expiration_date": str(today + timedelta(days=7))},  # Cashew nuts as cheese alternative
-        {"user_id": u1["id"], "name": "Olive Oil", "name_norm": "olive oil", "quantity": 250, "unit": "ml", "expiration_date": str(today + timedelta(days=365))},
+        {"user_id": u1["id"], "name": "Tomato", "name_norm": normalize_name("Tomato"), "quantity": 4, "unit": "pcs", "expiration_date": str(today + timedelta(days=3))},
+        {"user_id": u1["id"], "name": "Pasta", "name_norm": normalize_name("Pasta"), "quantity": 500, "unit": "g", "expiration_date": str(today + timedelta(days=180))},
+        {"user_id": u1["id"], "name": "Cashew Nuts", "name_norm": normalize_name("Cashew Nuts"), "quantity": 200, "unit": "g", "expiration_date": str(today + timedelta(days=7))},  # Cashew nuts as cheese alternative
+        {"user_id": u1["id"], "name": "Olive Oil", "name_norm": normalize_name("Olive Oil"), "quantity": 250, "unit": "ml", "expiration_date": str(today + timedelta(days=365))},
     ]
     supabase.table("food_stock").insert(foods).execute()
 
     # Alice's recipe: Pasta Pomodoro
     recipe = supabase.table("recipes").insert({"user_id": u1["id"], "title": "Pasta Pomodoro", "description": "Simple pasta with tomatoes and cashew nuts"}).execute().data[0]
     supabase.table("recipe_ingredients").insert([
-        {"recipe_id": recipe["id"], "name": "Pasta", "name_norm": "pasta", "quantity": 200, "unit": "g"},
-        {"recipe_id": recipe["id"], "name": "Tomato", "name_norm": "tomato", "quantity": 2, "unit": "pcs"},
-        {"recipe_id": recipe["id"], "name": "Cashew Nuts", "name_norm": "cashew nuts", "quantity": 50, "unit": "g"},  # Cashew nuts as cheese substitute
-        {"recipe_id": recipe["id"], "name": "Olive Oil", "name_norm": "olive oil", "quantity": 10, "unit": "ml"},
+        {"recipe_id": recipe["id"], "name": "Pasta", "name_norm": normalize_name("Pasta"), "quantity": 200, "unit": "g"},
+        {"recipe_id": recipe["id"], "name": "Tomato", "name_norm": normalize_name("Tomato"), "quantity": 2, "unit": "pcs"},
+        {"recipe_id": recipe["id"], "name": "Cashew Nuts", "name_norm": normalize_name("Cashew Nuts"), "quantity": 50, "unit": "g"},  # Cashew nuts as cheese substitute
+        {"recipe_id": recipe["id"], "name": "Olive Oil", "name_norm": normalize_name("Olive Oil"), "quantity": 10, "unit": "ml"},
     ]).execute()
 
     # Bob's data
     foods_bob = [
-        {"user_id": u2["id"], "name": "Oat Milk", "name_norm": "oat milk", "quantity": 1, "unit": "l", "expiration_date": str(today + timedelta(days=2))},  # Oat milk instead of regular milk
+        {"user_id": u2["id"], "name": "Oat Milk", "name_norm": normalize_name("Oat Milk"), "quantity": 1, "unit": "l", "expiration_date": str(today + timedelta(days=2))},  # Oat milk instead of regular milk
     ]
     supabase.table("food_stock").insert(foods_bob).execute()
 
@@ -1,17 +1,44 @@
+import os
+
+# Tests laufen ohne Netzwerk gegen den In-Memory-Stand-in (app/db/memory.py)
+os.environ["SUPABASE_BACKEND"] = "memory"
+
 import pytest
 from fastapi.testclient import TestClient
 
-from old_main import app, get_current_user
+from app.db import supabase as supabase_db
+from app.core.rate_limit import login_throttle
+from app.core.security import get_current_user_id
+from app.db.memory import InMemoryClient
+from app.services.expiry_index import expiry_indexes
+from app.services.ingredient_index import ingredient_indexes
+from app.services.recipe_service import suggestion_cache
+from main import app
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """
+    Frische In-Memory-Datenbank pro Test; die prozessweiten Indizes und
+    Caches werden geleert, damit nichts aus anderen Tests durchsickert.
+    """
+    memory = InMemoryClient()
+    monkeypatch.setattr(supabase_db, "_supabase_client", memory)
+    ingredient_indexes.clear()
+    expiry_indexes.clear()
+    suggestion_cache.clear()
+    login_throttle.clear()
+    yield memory
 
 
 @pytest.fixture
-def client():
+def client(db):
     """
     Stellt einen TestClient zur Verfügung und setzt standardmäßig
     den aktuellen Benutzer auf user_id = 1.
     """
     # Dependency Override für Auth
-    app.dependency_overrides[get_current_user] = lambda: 1
+    app.dependency_overrides[get_current_user_id] = lambda: 1
     with TestClient(app) as c:
         yield c
     # Nach dem Test wieder aufräumen
@@ -0,0 +1,30 @@
+import time
+
+from app.core.cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" ist jetzt zuletzt benutzt
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_lru_cache_expires_entries_after_ttl():
+    cache = LRUCache(maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats()["expirations"] == 1
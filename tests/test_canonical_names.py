@@ -0,0 +1,85 @@
+import asyncio
+
+from app.core.config import POSTGREST_MAX_ROWS
+from app.db.memory import InMemoryClient
+from app.services.utils import normalize_name
+from seed.backfill_name_norm import backfill
+
+
+def test_normalize_name_folds_plurals_accents_and_synonyms():
+    assert normalize_name("Tomatoes") == normalize_name("tomato") == normalize_name("Roma  Tomato") == "tomato"
+    assert normalize_name(" Crème Fraîche ") == "creme fraiche"
+    assert normalize_name("Berries") == "berry"
+    assert normalize_name("Peaches") == "peach"
+    assert normalize_name("Cashew Nuts") == "cashew nut"
+    # keine Kürzung bei Wörtern, deren "s" zum Stamm gehört
+    assert normalize_name("Reis") == "reis"
+    assert normalize_name("Couscous") == "couscous"
+    assert normalize_name("Paradeiser") == normalize_name("Tomate")
+
+
+def test_normalize_name_singularises_o_and_ie_plurals():
+    for plural, singular in (("Avocados", "avocado"), ("Tacos", "taco"), ("Mangos", "mango")):
+        assert normalize_name(plural) == normalize_name(singular) == singular
+    for plural, singular in (
+        ("Cookies", "cookie"), ("Brownies", "brownie"), ("Veggies", "veggie"), ("Chilies", "chili"),
+    ):
+        assert normalize_name(plural) == normalize_name(singular) == singular
+    assert normalize_name("Chillies") == normalize_name("Chilis") == "chili"
+    # "ies" zu "y" gilt weiterhin für die regelmäßigen Fälle
+    assert normalize_name("Cherries") == "cherry"
+    assert normalize_name("Kiwis") == "kiwi"
+    for plural, singular in (
+        ("Quiches", "quiche"), ("Brioches", "brioche"), ("Salamis", "salami"),
+        ("Raviolis", "ravioli"), ("Leaves", "leaf"), ("Loaves", "loaf"),
+    ):
+        assert normalize_name(plural) == normalize_name(singular) == singular
+    assert normalize_name("Bay Leaves") == "bay leaf"
+    # Singular mit "s" am Ende
+    assert normalize_name("Kokos") == "kokos"
+    assert normalize_name("Ananas") == "ananas"
+
+
+def test_backfill_recomputes_name_norm_in_batches_and_merges_lots():
+    """
+    Bestehende Zeilen bekommen die neue Normalisierung; Lots, die dadurch
+    denselben Schlüssel haben, werden zusammengelegt.
+    """
+    client = InMemoryClient()
+    client.insert_rows("food_stock", [
+        {"user_id": 1, "name": name, "name_norm": name.lower(), "quantity": qty, "unit": "stk", "expiration_date": "2030-01-01"}
+        for name, qty in (("Tomato", 2.0), ("Tomatoes", 3.0), ("Roma tomato", 1.0), ("Milch", 1.0), ("Zwiebeln", 4.0))
+    ])
+    client.insert_rows("recipe_ingredients", [
+        {"recipe_id": 1, "name": name, "name_norm": name.lower(), "quantity": "1", "unit": "stk"}
+        for name in ("Tomatoes", "Milch", "Cashew Nuts")
+    ])
+
+    dry = asyncio.run(backfill(client, batch_size=2, dry_run=True))
+    assert dry["food_stock"]["changed"] == 2
+    assert client.tables["food_stock"][1]["name_norm"] == "tomatoes"
+
+    stats = asyncio.run(backfill(client, batch_size=2))
+
+    assert stats["food_stock"]["batches"] == 3
+    assert stats["food_stock"]["merged"] == 2
+    food = {r["name_norm"]: r["quantity"] for r in client.tables["food_stock"]}
+    assert food == {"tomato": 6.0, "milch": 1.0, "zwiebeln": 4.0}
+    assert [r["name_norm"] for r in client.tables["recipe_ingredients"]] == ["tomato", "milch", "cashew nut"]
+
+    # ein zweiter Lauf findet nichts mehr
+    again = asyncio.run(backfill(client, batch_size=2))
+    assert again["food_stock"]["changed"] == again["recipe_ingredients"]["changed"] == 0
+
+
+def test_backfill_reads_every_row_with_a_batch_size_above_max_rows():
+    client = InMemoryClient(max_rows=POSTGREST_MAX_ROWS)
+    client.insert_rows("food_stock", [
+        {"user_id": 1, "name": "Tomatoes", "name_norm": "tomatoes", "quantity": 1.0, "unit": "stk", "expiration_date": str(i)}
+        for i in range(POSTGREST_MAX_ROWS + 5)
+    ])
+
+    stats = asyncio.run(backfill(client, batch_size=POSTGREST_MAX_ROWS * 5, dry_run=True))
+
+    assert stats["food_stock"]["scanned"] == stats["food_stock"]["changed"] == POSTGREST_MAX_ROWS + 5
+    assert stats["food_stock"]["batches"] == 2
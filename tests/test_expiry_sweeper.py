@@ -0,0 +1,90 @@
+import asyncio
+from datetime import date, timedelta
+
+from app.core.config import POSTGREST_MAX_ROWS
+from app.db.memory import InMemoryClient
+from app.repositories.food import FoodRepository
+from app.services.expiry_sweeper import ExpirySweeper
+
+TODAY = date(2030, 1, 10)
+
+
+def lot(user_id, name, days):
+    return {
+        "user_id": user_id, "name": name, "name_norm": name.lower(), "quantity": 1.0,
+        "unit": "stk", "expiration_date": str(TODAY + timedelta(days=days)),
+    }
+
+
+def test_scan_builds_digests_and_releases_lots_as_days_pass():
+    client = InMemoryClient()
+    client.insert_rows("food_stock", [
+        lot(1, "Milch", 1), lot(1, "Käse", 8), lot(1, "Joghurt", -2), lot(2, "Brot", 3),
+    ])
+    today = [TODAY]
+    sweeper = ExpirySweeper(warning_days=5, page_size=2, today=lambda: today[0])
+
+    asyncio.run(sweeper.scan(FoodRepository(client)))
+
+    assert sweeper.last_scan["lots"] == 3  # bereits Abgelaufenes wird nicht geladen
+    assert sweeper.last_scan["pages"] == 2
+    assert [i["name"] for i in sweeper.digest(1)] == ["Milch"]
+    assert [i["name"] for i in sweeper.digest(2)] == ["Brot"]
+
+    today[0] = TODAY + timedelta(days=3)
+    sweeper.release_due()
+    assert [i["name"] for i in sweeper.digest(1)] == ["Käse"]  # Milch ist abgelaufen
+    assert sweeper.digest(1)[0]["expiration_date"] == "2030-01-18"
+    assert [i["name"] for i in sweeper.digest(2)] == ["Brot"]
+
+    today[0] = TODAY + timedelta(days=4)
+    sweeper.release_due()
+    assert sweeper.digest(2) == []  # Brot ist inzwischen abgelaufen
+
+
+def test_scan_pages_stay_within_the_max_rows_cap():
+    """
+    Eine Seitengröße über max-rows würde abgeschnitten zurückkommen und den
+    Scan nach der ersten Seite beenden; sie wird deshalb begrenzt.
+    """
+    client = InMemoryClient(max_rows=POSTGREST_MAX_ROWS)
+    client.insert_rows("food_stock", [lot(1, f"Apfel {i}", 1 + i % 30) for i in range(POSTGREST_MAX_ROWS + 50)])
+    sweeper = ExpirySweeper(warning_days=5, page_size=POSTGREST_MAX_ROWS * 5, today=lambda: TODAY)
+
+    asyncio.run(sweeper.scan(FoodRepository(client)))
+
+    assert sweeper.last_scan["lots"] == POSTGREST_MAX_ROWS + 50
+    assert sweeper.last_scan["pages"] == 2
+
+
+def test_writes_are_pushed_into_a_ready_sweeper():
+    sweeper = ExpirySweeper(warning_days=5, today=lambda: TODAY)
+    asyncio.run(sweeper.scan(FoodRepository(InMemoryClient())))
+
+    sweeper.lot_saved({"id": 1, **lot(1, "Milch", 2)})
+    sweeper.lot_saved({"id": 2, **lot(1, "Reis", 100)})
+    assert [i["id"] for i in sweeper.digest(1)] == [1]
+
+    sweeper.lot_removed({"id": 1})
+    assert sweeper.digest(1) == []
+    assert sweeper.stats()["tracked_lots"] == 1
+
+    sweeper.stock_cleared(1)
+    assert sweeper.stats()["tracked_lots"] == 0
+
+
+def test_background_task_scans_on_start():
+    client = InMemoryClient()
+    client.insert_rows("food_stock", [lot(1, "Milch", 1)])
+    sweeper = ExpirySweeper(warning_days=5, today=lambda: TODAY)
+
+    async def run():
+        sweeper.start(FoodRepository(client))
+        for _ in range(100):
+            if sweeper.ready:
+                break
+            await asyncio.sleep(0.01)
+        await sweeper.stop()
+
+    asyncio.run(run())
+    assert [i["name"] for i in sweeper.digest(1)] == ["Milch"]
@@ -0,0 +1,60 @@
+import asyncio
+import csv
+import io
+import json
+
+from app.db.memory import InMemoryClient
+from app.repositories.food import FoodRepository
+from app.repositories.recipes import RecipeRepository
+from app.services.export_service import ExportService
+
+
+def make_client():
+    client = InMemoryClient()
+    client.insert_rows("food_stock", [
+        {
+            "user_id": 1, "name": f"Apfel {i}", "name_norm": f"apfel {i}",
+            "quantity": 1.0, "unit": "stk", "expiration_date": f"2030-01-{1 + i:02d}",
+        }
+        for i in range(7)
+    ])
+    for i in range(3):
+        recipe = client.insert_rows("recipes", {"user_id": 1, "title": f"Rezept {i}", "description": "x"})[0]
+        client.insert_rows("recipe_ingredients", [
+            {"recipe_id": recipe["id"], "name": "Apfel", "name_norm": "apfel", "quantity": "2", "unit": "stk"},
+            {"recipe_id": recipe["id"], "name": "Zimt", "name_norm": "zimt", "quantity": "1", "unit": "g"},
+        ])
+    return client
+
+
+def collect(stream):
+    async def run():
+        return [chunk async for chunk in stream]
+    return asyncio.run(run())
+
+
+def test_ndjson_export_streams_every_row_page_by_page():
+    client = make_client()
+    service = ExportService(FoodRepository(client), RecipeRepository(client), page_size=2)
+
+    chunks = collect(service.ndjson(1))
+    records = [json.loads(line) for line in "".join(chunks).splitlines()]
+
+    assert len(chunks) == 6  # 4 Vorrats-Seiten + 2 Rezept-Seiten
+    assert [r["type"] for r in records] == ["food"] * 7 + ["recipe"] * 3
+    assert [i["name"] for i in records[-1]["ingredients"]] == ["Apfel", "Zimt"]
+
+
+def test_csv_export_flattens_recipes_into_ingredient_rows():
+    client = make_client()
+    service = ExportService(FoodRepository(client), RecipeRepository(client), page_size=5)
+
+    rows = list(csv.DictReader(io.StringIO("".join(collect(service.csv(1))))))
+
+    types = [r["record_type"] for r in rows]
+    assert types.count("food") == 7
+    assert types.count("recipe") == 3
+    assert types.count("recipe_ingredient") == 6
+    zimt = next(r for r in rows if r["name"] == "Zimt")
+    assert zimt["recipe_title"] == "Rezept 0"
+    assert zimt["unit"] == "g"
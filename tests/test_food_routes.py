@@ -1,5 +1,7 @@
 from datetime import date
 
+from app.core.config import POSTGREST_MAX_ROWS
+
 
 def test_list_food_items_forbidden_for_other_user(client):
     """
@@ -11,28 +13,19 @@ def test_list_food_items_forbidden_for_other_user(client):
     assert response.json()["detail"] == "Access denied"
 
 
-def test_list_food_items_returns_items(client, monkeypatch):
-    class FakeResponse:
-        def __init__(self, data):
-            self.data = data
-
-    def fake_get_all_food_items(user_id: int):
-        assert user_id == 1
-        return FakeResponse(
-            data=[
-                {
-                    "id": 10,
-                    "user_id": 1,
-                    "name": "Milch",
-                    "name_norm": "milch",
-                    "quantity": 1.0,
-                    "unit": "l",
-                    "expiration_date": str(date(2025, 12, 1)),
-                }
-            ]
-        )
-
-    monkeypatch.setattr("main.get_all_food_items", fake_get_all_food_items)
+def test_list_food_items_returns_items(client, db):
+    db.insert_rows("food_stock", [
+        {
+            "user_id": 1,
+            "name": "Milch",
+            "name_norm": "milch",
+            "quantity": 1.0,
+            "unit": "l",
+            "expiration_date": "2025-12-01",
+        },
+        # gehört einem anderen User
+        {"user_id": 2, "name": "Brot", "name_norm": "brot", "quantity": 1.0, "unit": "stk", "expiration_date": None},
+    ])
 
     response = client.get("/users/1/food")
     assert response.status_code == 200
@@ -42,30 +35,7 @@ def test_list_food_items_returns_items(client, monkeypatch):
     assert body["items"][0]["name"] == "Milch"
 
 
-def test_add_food_item_success(client, monkeypatch):
-    class FakeResponse:
-        def __init__(self, data):
-            self.data = data
-
-    def fake_add_or_update_food_item(user_id, item):
-        assert user_id == 1
-        # Wir tun so, als wäre ein neues Item angelegt worden
-        return FakeResponse(
-            data=[
-                {
-                    "id": 42,
-                    "user_id": user_id,
-                    "name": item.name,
-                    "name_norm": item.name.lower(),
-                    "quantity": item.quantity,
-                    "unit": item.unit,
-                    "expiration_date": str(item.expiration_date),
-                }
-            ]
-        ), "created"
-
-    monkeypatch.setattr("main.add_or_update_food_item", fake_add_or_update_food_item)
-
+def test_add_food_item_success(client, db):
     payload = {
         "name": "Milch",
         "quantity": 2,
@@ -79,13 +49,37 @@ def test_add_food_item_success(client, monkeypatch):
     assert body["message"] == "Item created"
     assert body["data"][0]["name"] == "Milch"
 
+    # gleiches Lot nochmal => Menge wird addiert
+    response = client.post("/users/1/food", json=payload)
+    assert response.json()["message"] == "Item updated"
+    assert db.tables["food_stock"][0]["quantity"] == 4
 
-def test_food_item_detail_not_found_returns_404(client, monkeypatch):
-    def fake_get_food_item_detail(user_id: int, item_id: int):
-        return None  # Item existiert nicht
-
-    monkeypatch.setattr("main.get_food_item_detail", fake_get_food_item_detail)
 
+def test_food_item_detail_not_found_returns_404(client):
     response = client.get("/users/1/food/999")
     assert response.status_code == 404
     assert response.json()["detail"] == "Item not found"
+
+
+def test_food_list_is_documented_by_its_response_model_and_sent_as_is(client, db):
+    db.insert_rows("food_stock", {
+        "user_id": 1, "name": "Milch", "name_norm": "milch", "quantity": 1.0, "unit": "l",
+        "expiration_date": date(2025, 12, 1),
+    })
+
+    response = client.get("/users/1/food", params={"fields": "name"})
+
+    # Nur die angefragten Spalten, keine vom Modell aufgefüllten null-Felder
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["items"] == [{"id": 1, "expiration_date": "2025-12-01", "name": "Milch"}]
+    schema = client.get("/openapi.json").json()
+    ok = schema["paths"]["/users/{user_id}/food"]["get"]["responses"]["200"]
+    assert ok["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/FoodItemPage"}
+
+
+def test_bulk_payload_above_max_rows_is_rejected(client, db):
+    payload = [{"name": f"Artikel {i}", "quantity": 1, "unit": "stk"} for i in range(POSTGREST_MAX_ROWS + 1)]
+
+    response = client.post("/users/1/food/bulk", json=payload)
+    assert response.status_code == 422
+    assert db.tables["food_stock"] == []
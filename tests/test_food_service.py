@@ -0,0 +1,253 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api import food as food_routes
+from app.api.deps import get_food_service
+from app.core.config import FOOD_PAGE_MAX_LIMIT, POSTGREST_MAX_ROWS
+from app.core.security import get_current_user_id
+from app.db.memory import InMemoryClient
+from app.models.schemas import FoodItemConsume, FoodItemCreate
+from app.repositories.food import FoodRepository
+from app.services.data_version import DataVersions
+from app.services.food_service import FoodService
+from app.services.user_index import UserIndexRegistry
+
+
+def make_service(client):
+    versions = DataVersions()
+    return FoodService(
+        FoodRepository(client), UserIndexRegistry(versions), expiry_indexes=UserIndexRegistry(versions)
+    )
+
+
+def item(name, quantity, unit="stk", expiration_date=date(2030, 1, 1)):
+    return FoodItemCreate(name=name, quantity=quantity, unit=unit, expiration_date=expiration_date)
+
+
+def test_bulk_add_merges_payload_and_uses_one_call():
+    """
+    Doppelte Positionen im Payload werden zusammengefasst, bestehende Lots
+    bekommen die Menge dazu - alles in genau einem DB-Aufruf. Das Ergebnis
+    hat einen Eintrag pro Eingabeposition, in derselben Reihenfolge.
+    """
+    client = InMemoryClient()
+    client.insert_rows("food_stock", {
+        "user_id": 1, "name": "Milch", "name_norm": "milch",
+        "quantity": 1.0, "unit": "l", "expiration_date": "2030-01-01",
+    })
+    payload = [item("Milch", 2, unit="l"), item("Tomate", 3), item(" tomate ", 2), item("Milch", 1, unit="ml")]
+
+    results = asyncio.run(make_service(client).bulk_add_food_items(1, payload))
+
+    assert client.round_trips == 1
+    assert [(r["data"]["name_norm"], r["data"]["unit"]) for r in results] == [
+        ("milch", "l"), ("tomate", "stk"), ("tomate", "stk"), ("milch", "ml"),
+    ]
+    assert results[0]["status"] == "updated"
+    assert results[0]["data"]["quantity"] == 3.0
+    assert results[1] == results[2]
+    assert results[1]["status"] == "created"
+    assert results[1]["data"]["quantity"] == 5.0
+    assert results[3]["status"] == "created"
+    assert len(client.tables["food_stock"]) == 3
+
+
+class ShortUpsertRepository(FoodRepository):
+    async def upsert_food_items(self, user_id, items):
+        rows = await super().upsert_food_items(user_id, items)
+        return rows[:-1]
+
+
+def test_bulk_add_reports_lots_missing_from_the_upsert():
+    """Fehlt ein Lot in der Antwort, gibt es einen klaren Fehler statt KeyError."""
+    versions = DataVersions()
+    service = FoodService(ShortUpsertRepository(InMemoryClient()), UserIndexRegistry(versions),
+                          expiry_indexes=UserIndexRegistry(versions))
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(service.bulk_add_food_items(1, [item("Milch", 1), item("Tomate", 2)]))
+    assert exc.value.status_code == 500
+    assert exc.value.detail == "Upsert returned 1 of 2 lots"
+
+
+def test_concurrent_consumes_do_not_lose_updates():
+    """
+    Zwei Geräte verbrauchen gleichzeitig: jeder Aufruf ist ein einziger
+    atomarer Round Trip, beide Abzüge kommen an.
+    """
+    client = InMemoryClient(latency=0.01)
+    row = client.insert_rows("food_stock", {
+        "user_id": 1, "name": "Milch", "name_norm": "milch",
+        "quantity": 3.0, "unit": "l", "expiration_date": "2030-01-01",
+    })[0]
+    service = make_service(client)
+
+    async def consume_twice():
+        return await asyncio.gather(
+            service.consume_item(1, row["id"], FoodItemConsume(quantity=1)),
+            service.consume_item(1, row["id"], FoodItemConsume(quantity=1)),
+        )
+
+    asyncio.run(consume_twice())
+    assert client.round_trips == 2
+    assert client.tables["food_stock"][0]["quantity"] == 1.0
+
+    result = asyncio.run(service.consume_item(1, row["id"], FoodItemConsume(quantity=5)))
+    assert result == {"message": "Item consumed and removed"}
+    assert client.tables["food_stock"] == []
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(service.consume_item(1, row["id"], FoodItemConsume(quantity=1)))
+    assert exc.value.status_code == 404
+
+
+def test_list_food_items_pages_by_expiration_date_and_id():
+    client = InMemoryClient()
+    client.insert_rows("food_stock", [
+        {
+            "user_id": 1, "name": f"Apfel {i}", "name_norm": f"apfel {i}", "quantity": 1.0,
+            "unit": "stk" if i % 2 else "kg", "expiration_date": f"2030-01-{1 + i % 3:02d}",
+        }
+        for i in range(10)
+    ] + [
+        {"user_id": 1, "name": "Salz", "name_norm": "salz", "quantity": 1.0, "unit": "kg", "expiration_date": None},
+        {"user_id": 2, "name": "Apfel", "name_norm": "apfel", "quantity": 1.0, "unit": "stk", "expiration_date": "2030-01-01"},
+    ])
+    service = make_service(client)
+
+    seen, cursor = [], None
+    while True:
+        page = asyncio.run(service.list_food_items(1, limit=4, cursor=cursor, fields="name"))
+        assert len(page["items"]) <= 4
+        assert set(page["items"][0]) == {"id", "expiration_date", "name"}
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    keys = [(r["expiration_date"] or "9999", r["id"]) for r in seen]
+    assert keys == sorted(keys)
+    assert len(seen) == 11
+    assert seen[-1]["name"] == "Salz"
+
+    filtered = asyncio.run(service.list_food_items(1, limit=100, name_prefix="Apfel", unit="kg"))
+    assert len(filtered["items"]) == 5
+    assert all(r["unit"] == "kg" and r["name_norm"].startswith("apfel") for r in filtered["items"])
+
+
+def test_largest_food_page_still_gets_a_cursor_under_max_rows():
+    client = InMemoryClient(max_rows=POSTGREST_MAX_ROWS)
+    client.insert_rows("food_stock", [
+        {"user_id": 1, "name": f"Apfel {i}", "name_norm": f"apfel {i}", "quantity": 1.0, "unit": "stk", "expiration_date": None}
+        for i in range(POSTGREST_MAX_ROWS + 1)
+    ])
+    service = make_service(client)
+
+    page = asyncio.run(service.list_food_items(1, limit=FOOD_PAGE_MAX_LIMIT))
+    assert len(page["items"]) == FOOD_PAGE_MAX_LIMIT
+    assert page["next_cursor"] is not None
+    rest = asyncio.run(service.list_food_items(1, limit=FOOD_PAGE_MAX_LIMIT, cursor=page["next_cursor"]))
+    assert len(rest["items"]) == POSTGREST_MAX_ROWS + 1 - FOOD_PAGE_MAX_LIMIT
+
+
+def test_list_food_items_rejects_unknown_fields_and_bad_cursor():
+    service = make_service(InMemoryClient())
+
+    for kwargs in ({"fields": "name,password_hash"}, {"cursor": "kaputt"}):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(service.list_food_items(1, limit=10, **kwargs))
+        assert exc.value.status_code == 400
+
+
+def test_expiring_items_are_served_from_the_warm_index():
+    """
+    Nach dem ersten Aufruf kommt jedes ``days``-Fenster ohne DB-Zugriff aus
+    dem Index; Schreibzugriffe des Service halten ihn aktuell.
+    """
+    today = date.today()
+    client = InMemoryClient()
+    client.insert_rows("food_stock", [
+        {
+            "user_id": 1, "name": name, "name_norm": name.lower(), "quantity": 1.0, "unit": "stk",
+            "expiration_date": str(today + timedelta(days=days)) if days is not None else None,
+        }
+        for name, days in (("Joghurt", -1), ("Milch", 0), ("Brot", 2), ("Käse", 9), ("Salz", None))
+    ])
+    service = make_service(client)
+
+    def names(days):
+        return [i["name"] for i in asyncio.run(service.get_expiring_items(1, days))["items"]]
+
+    assert names(5) == ["Milch", "Brot"]
+    assert client.round_trips == 1
+    assert names(0) == ["Milch"]
+    assert names(30) == ["Milch", "Brot", "Käse"]
+    assert client.round_trips == 1
+
+    asyncio.run(service.add_or_update_food_item(1, item("Tomate", 2, expiration_date=today + timedelta(days=1))))
+    brot = next(r for r in client.tables["food_stock"] if r["name"] == "Brot")
+    asyncio.run(service.delete_item(1, brot["id"]))
+    rounds = client.round_trips
+    assert names(5) == ["Milch", "Tomate"]
+    assert client.round_trips == rounds
+
+    asyncio.run(service.delete_all_food(1))
+    assert names(30) == []
+
+
+def test_expiring_route_is_not_shadowed_by_item_detail():
+    service = make_service(InMemoryClient())
+    app = FastAPI()
+    app.include_router(food_routes.router)
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    app.dependency_overrides[get_food_service] = lambda: service
+
+    with TestClient(app) as c:
+        response = c.get("/users/1/food/expiring", params={"days": 3})
+
+    assert response.status_code == 200
+    assert response.json() == {"items": []}
+
+
+def test_expiring_window_past_the_calendar_end_covers_every_dated_lot():
+    client = InMemoryClient()
+    client.insert_rows("food_stock", {
+        "user_id": 1, "name": "Honig", "name_norm": "honig",
+        "quantity": 1.0, "unit": "stk", "expiration_date": "9999-12-31",
+    })
+    service = make_service(client)
+    app = FastAPI()
+    app.include_router(food_routes.router)
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    app.dependency_overrides[get_food_service] = lambda: service
+
+    with TestClient(app) as c:
+        response = c.get("/users/1/food/expiring", params={"days": 100000000})
+
+    assert response.status_code == 200
+    assert [i["name"] for i in response.json()["items"]] == ["Honig"]
+
+
+def test_expiry_index_reads_past_the_max_rows_cap():
+    """
+    PostgREST schneidet jede Abfrage bei max-rows ab; der Index wird deshalb
+    seitenweise aufgebaut und enthält trotzdem alle Lots.
+    """
+    today = date.today()
+    client = InMemoryClient(max_rows=POSTGREST_MAX_ROWS)
+    client.insert_rows("food_stock", [
+        {
+            "user_id": 1, "name": f"Apfel {i}", "name_norm": f"apfel {i}", "quantity": 1.0, "unit": "stk",
+            "expiration_date": str(today + timedelta(days=i % 4)) if i % 10 else None,
+        }
+        for i in range(POSTGREST_MAX_ROWS + 50)
+    ])
+    service = make_service(client)
+
+    items = asyncio.run(service.get_expiring_items(1, 5))["items"]
+    assert len(items) == (POSTGREST_MAX_ROWS + 50) * 9 // 10
+    assert client.round_trips == 2
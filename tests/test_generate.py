@@ -0,0 +1,37 @@
+import asyncio
+from datetime import date
+
+from app.db.memory import InMemoryClient
+from seed.generate import generate
+
+
+def make(seed=7):
+    db = InMemoryClient()
+    counts = asyncio.run(generate(
+        db, users=3, lots_per_user=40, recipes_per_user=5, ingredients_per_recipe=4,
+        seed=seed, today=date(2030, 1, 1), chunk_size=50,
+    ))
+    return db, counts
+
+
+def content(db):
+    # ohne password_hash, der ist gesalzen
+    return {
+        table: [{k: v for k, v in row.items() if k != "password_hash"} for row in rows]
+        for table, rows in db.tables.items()
+    }
+
+
+def test_generator_is_deterministic_and_writes_in_bulk():
+    db, counts = make()
+
+    assert counts == {
+        "users": 3, "food_stock": 120, "recipes": 15, "recipe_ingredients": 60, "user_ids": [1, 2, 3],
+    }
+    # ein Insert pro Chunk: users 1, food_stock 3, recipes 1, recipe_ingredients 2
+    assert db.round_trips == 7
+    lot_keys = [(r["user_id"], r["name_norm"], r["unit"], r["expiration_date"]) for r in db.tables["food_stock"]]
+    assert len(set(lot_keys)) == len(lot_keys)
+
+    assert content(make()[0]) == content(db)
+    assert content(make(seed=8)[0]) != content(db)
@@ -0,0 +1,68 @@
+import asyncio
+
+import httpx
+from supabase import AsyncClientOptions, acreate_client
+
+from app.db.http_pool import MonitoredTransport
+
+
+class Body(httpx.AsyncByteStream):
+    """Gestreamter Body wie bei echten Verbindungen (Mock-Antworten sind sonst schon gelesen)."""
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    async def __aiter__(self):
+        yield self.content
+
+
+def test_monitored_transport_counts_saturation_until_the_body_is_closed():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def handler(request):
+            await release.wait()
+            return httpx.Response(200, stream=Body(b"[]"))
+
+        pool = MonitoredTransport(httpx.MockTransport(handler), max_connections=2, max_keepalive=1, http2=False)
+        async with httpx.AsyncClient(transport=pool) as http:
+            tasks = [asyncio.create_task(http.get("http://db/rest/v1/x")) for _ in range(3)]
+            await asyncio.sleep(0)
+            # drei gleichzeitige Requests bei zwei Verbindungen: einer muss warten
+            assert pool.stats()["in_flight"] == 3
+            release.set()
+            await asyncio.gather(*tasks)
+        return pool.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["in_flight"] == 0
+    assert stats["peak_in_flight"] == 3
+    assert stats["requests"] == 3
+    assert stats["saturated_requests"] == 1
+
+
+def test_supabase_client_sends_through_the_shared_pool():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, headers={"content-type": "application/json"}, stream=Body(b'[{"id": 1}]'))
+
+    async def scenario():
+        pool = MonitoredTransport(httpx.MockTransport(handler), max_connections=10, max_keepalive=5, http2=False)
+        http = httpx.AsyncClient(transport=pool)
+        client = await acreate_client(
+            "https://demo.supabase.co", "anon-key", options=AsyncClientOptions(httpx_client=http)
+        )
+        rows = (await client.table("food_stock").select("id").eq("user_id", 1).execute()).data
+        await http.aclose()
+        return rows, pool.stats()
+
+    rows, stats = asyncio.run(scenario())
+
+    assert rows == [{"id": 1}]
+    assert stats["requests"] == 1 and stats["in_flight"] == 0
+    # absolute URL und API-Key kommen vom Request, nicht vom geteilten Client
+    assert str(seen[0].url).startswith("https://demo.supabase.co/rest/v1/food_stock")
+    assert seen[0].headers["apikey"] == "anon-key"
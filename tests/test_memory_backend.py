@@ -0,0 +1,54 @@
+import asyncio
+
+from app.db import supabase as supabase_db
+from app.db.memory import InMemoryClient
+
+
+def run(query):
+    return asyncio.run(query.execute()).data
+
+
+def test_hash_indexes_follow_inserts_updates_and_deletes():
+    db = InMemoryClient()
+    db.insert_rows("food_stock", [
+        {"user_id": u, "name": n, "name_norm": n.lower(), "quantity": 1.0, "unit": "stk", "expiration_date": None}
+        for u, n in ((1, "Milch"), (2, "Brot"), (1, "Käse"), (1, "Eier"))
+    ])
+
+    assert [r["name"] for r in run(db.table("food_stock").select("name").eq("user_id", 1))] == ["Milch", "Käse", "Eier"]
+    # Index existiert jetzt und wird von allen Schreibzugriffen gepflegt
+    run(db.table("food_stock").update({"user_id": 2}).eq("name", "Käse"))
+    run(db.table("food_stock").delete().eq("user_id", 1).eq("name", "Eier"))
+    run(db.table("food_stock").insert({"user_id": "1", "name": "Tomate"}))
+
+    assert [r["name"] for r in run(db.table("food_stock").select("*").eq("user_id", 1))] == ["Milch", "Tomate"]
+    assert [r["name"] for r in run(db.table("food_stock").select("*").eq("user_id", "2"))] == ["Brot", "Käse"]
+    assert [r["name"] for r in run(db.table("food_stock").select("*").neq("user_id", 1))] == ["Brot", "Käse"]
+    assert db.round_trips == 7
+
+
+def test_embedded_children_come_from_the_foreign_key_index():
+    db = InMemoryClient()
+    recipes = db.insert_rows("recipes", [{"user_id": 1, "title": t} for t in ("Suppe", "Salat")])
+    db.insert_rows("recipe_ingredients", [
+        {"recipe_id": recipes[1]["id"], "name": "Gurke"},
+        {"recipe_id": recipes[0]["id"], "name": "Lauch"},
+        {"recipe_id": recipes[1]["id"], "name": "Tomate"},
+    ])
+
+    rows = run(db.table("recipes").select("title, recipe_ingredients(name)").eq("user_id", 1))
+
+    assert rows == [
+        {"title": "Suppe", "recipe_ingredients": [{"name": "Lauch"}]},
+        {"title": "Salat", "recipe_ingredients": [{"name": "Gurke"}, {"name": "Tomate"}]},
+    ]
+
+
+def test_memory_backend_is_wired_into_get_supabase_client(monkeypatch):
+    # conftest.py setzt SUPABASE_BACKEND=memory
+    monkeypatch.setattr(supabase_db, "_supabase_client", None)
+
+    client = asyncio.run(supabase_db.get_supabase_client())
+
+    assert isinstance(client, InMemoryClient)
+    assert asyncio.run(supabase_db.get_supabase_client()) is client
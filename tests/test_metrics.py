@@ -0,0 +1,38 @@
+from app.core.metrics import Histogram
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    h = Histogram("demo_seconds", "Demo.", ("route",), (0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        h.observe(value, "/a")
+
+    lines = h.render().splitlines()
+
+    assert lines[:2] == ["# HELP demo_seconds Demo.", "# TYPE demo_seconds histogram"]
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{route="/a"} 4' in lines
+
+
+def test_requests_report_round_trips_and_feed_the_metrics_endpoint(client, db):
+    db.insert_rows("food_stock", {
+        "user_id": 1, "name": "Milch", "name_norm": "milch", "quantity": 1.0, "unit": "l", "expiration_date": None,
+    })
+
+    response = client.get("/users/1/food")
+
+    assert response.headers["x-db-round-trips"] == "1"
+    assert response.headers["server-timing"].startswith("db;dur=")
+
+    # Consume = ein RPC-Aufruf
+    item_id = response.json()["items"][0]["id"]
+    response = client.post(f"/users/1/food/{item_id}/consume", json={"quantity": 0.5})
+    assert response.headers["x-db-round-trips"] == "1"
+
+    metrics = client.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain")
+    body = metrics.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/users/{user_id}/food",status="200"}' in body
+    assert 'http_request_db_round_trips_bucket{method="GET",route="/users/{user_id}/food",le="1"}' in body
+    assert 'db_execute_duration_seconds_count{target="rpc:consume_food_item"}' in body
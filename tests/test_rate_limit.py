@@ -0,0 +1,58 @@
+from app.api.deps import get_user_service
+from app.core.rate_limit import LoginThrottle, TokenBuckets
+from app.core.security import hash_password
+from app.repositories.users import UserRepository
+from app.services.user_service import UserService
+from main import app
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_buckets_refill_over_time_and_evict_least_recently_used():
+    clock = FakeClock()
+    buckets = TokenBuckets(rate=0.5, burst=2, max_buckets=2, clock=clock)
+
+    buckets.take("a")
+    buckets.take("a")
+    assert buckets.wait_time("a") == 2.0
+    clock.now = 1.0
+    assert buckets.wait_time("a") == 1.0
+    clock.now = 10.0
+    assert buckets.wait_time("a") == 0.0  # wieder voll, aber nicht über burst
+
+    buckets.take("b")
+    buckets.take("c")  # verdrängt "a"
+    assert len(buckets) == 2 and buckets.evictions == 1
+
+
+def test_login_is_throttled_before_lookup_and_hashing(client, db):
+    db.insert_rows("users", {
+        "username": "alice", "email": "alice@example.com", "password_hash": hash_password("secret"),
+    })
+    throttle = LoginThrottle(TokenBuckets(1 / 60, 2, 100), TokenBuckets(1 / 60, 100, 100))
+    app.dependency_overrides[get_user_service] = lambda: UserService(UserRepository(db), throttle)
+
+    statuses = [client.post("/login/", json={"username": u, "password": "falsch"}).status_code for u in ("alice", "Alice")]
+    round_trips = db.round_trips
+    response = client.post("/login/", json={"username": "ALICE", "password": "secret"})
+
+    assert statuses == [401, 401]
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "60"
+    # kein Lookup, kein bcrypt
+    assert db.round_trips == round_trips
+    stats = throttle.stats()
+    assert (stats["allowed"], stats["rejected"], stats["rejected_existing_users"]) == (2, 1, 1)
+    assert stats["cpu_seconds_avoided"] > 0
+
+    # unbekannte Benutzernamen scheitern vor bcrypt; ihre Ablehnung spart keine Rechenzeit
+    for _ in range(3):
+        client.post("/login/", json={"username": "mallory", "password": "falsch"})
+    stats = throttle.stats()
+    assert (stats["rejected"], stats["rejected_existing_users"]) == (2, 1)
@@ -1,110 +1,106 @@
+import asyncio
+import json
 from datetime import date
 
-import types
+from app.core.cache import LRUCache
+from app.core.config import RECIPE_IMPORT_CHUNK_SIZE
+from app.db.memory import InMemoryClient
+from app.repositories.food import FoodRepository
+from app.repositories.recipes import RecipeRepository
+from app.services.data_version import DataVersions
+from app.services.recipe_service import RecipeService
+from app.services.user_index import UserIndexRegistry
 
-from old_main import compute_recipe_suggestions
 
-
-class FakeResponse:
-    def __init__(self, data):
-        self.data = data
-
-
-class FakeTable:
-    """
-    Sehr einfache Fake-Table-Implementierung, die nur das unterstützt,
-    was compute_recipe_suggestions nutzt (select, eq, execute).
-    """
-
-    def __init__(self, rows):
-        self._rows = rows
-        self._filters = {}
-
-    def select(self, *args, **kwargs):
-        return self
-
-    def eq(self, column, value):
-        self._filters[column] = value
-        return self
-
-    def execute(self):
-        filtered = [
-            row
-            for row in self._rows
-            if all(row.get(col) == val for col, val in self._filters.items())
-        ]
-        return FakeResponse(filtered)
-
-
-class FakeSupabase:
-    def __init__(self, recipes, ingredients):
-        self._recipes_table = FakeTable(recipes)
-        self._ingredients_table = FakeTable(ingredients)
-
-    def table(self, name: str):
-        if name == "recipes":
-            return self._recipes_table
-        if name == "recipe_ingredients":
-            return self._ingredients_table
-        raise ValueError(f"Unknown table: {name}")
-
-
-def test_compute_recipe_suggestions_user_can_make_recipe(monkeypatch):
+def test_compute_recipe_suggestions_user_can_make_recipe():
     """
     Szenario:
       - User hat 'Tomate' im Stock
       - Es gibt ein Rezept 'Tomatensalat' mit Zutat 'Tomate'
       => compute_recipe_suggestions soll das Rezept ohne missing_ingredients vorschlagen.
     """
-
-    # Fake get_all_food_items(user_id)
-    def fake_get_all_food_items(user_id: int):
-        assert user_id == 1
-        return FakeResponse(
-            data=[
-                {
-                    "id": 1,
-                    "user_id": 1,
-                    "name": "Tomate",
-                    "name_norm": "tomate",
-                    "quantity": 3,
-                    "unit": "stk",
-                    "expiration_date": str(date.today()),
-                }
-            ]
-        )
-
-    # Fake-Supabase mit einem Rezept + einer Zutat
-    fake_supabase = FakeSupabase(
-        recipes=[
-            {"id": 100, "user_id": 1, "title": "Tomatensalat", "description": "Lecker."},
-        ],
-        ingredients=[
-            {
-                "id": 200,
-                "recipe_id": 100,
-                "name": "Tomate",
-                "name_norm": "tomate",
-                "quantity": 2,
-                "unit": "stk",
-            }
-        ],
+    db = InMemoryClient()
+    db.insert_rows("food_stock", {
+        "user_id": 1,
+        "name": "Tomate",
+        "name_norm": "tomate",
+        "quantity": 3,
+        "unit": "stk",
+        "expiration_date": str(date.today()),
+    })
+    recipe = db.insert_rows("recipes", {"user_id": 1, "title": "Tomatensalat", "description": "Lecker."})[0]
+    db.insert_rows("recipe_ingredients", {
+        "recipe_id": recipe["id"],
+        "name": "Tomate",
+        "name_norm": "tomate",
+        "quantity": "2",
+        "unit": "stk",
+    })
+    service = RecipeService(
+        RecipeRepository(db), FoodRepository(db), UserIndexRegistry(DataVersions()), LRUCache(maxsize=10)
     )
 
-    # main.get_all_food_items und main.supabase ersetzen
-    monkeypatch.setattr("main.get_all_food_items", fake_get_all_food_items)
-    monkeypatch.setattr("main.supabase", fake_supabase)
-
-    from old_main import compute_recipe_suggestions  # nach Monkeypatch importieren (optional)
-
-    result = compute_recipe_suggestions(user_id=1)
+    result = asyncio.run(service.compute_recipe_suggestions(user_id=1))
     suggestions = result.get("suggestions", [])
 
-    # In deiner Implementierung liefert compute_recipe_suggestions ein Dict:
+    # compute_recipe_suggestions liefert ein Dict:
     # { "suggestions": [ {...}, {...} ] }
     assert isinstance(suggestions, list)
     assert len(suggestions) == 1
     recipe = suggestions[0]
     assert recipe["title"] == "Tomatensalat"
     assert "ingredients" in recipe
+    assert "missing_ingredients" not in recipe
     assert recipe["ingredients"] == ["Tomate"]
+
+
+def test_bulk_recipe_import_streams_progress_per_chunk(client, db):
+    recipes = [
+        {"title": f"Rezept {i}", "ingredients": [
+            {"name": "Tomate", "quantity": 1, "unit": "stk", "expiration_date": "2025-12-01"},
+        ]}
+        for i in range(RECIPE_IMPORT_CHUNK_SIZE + 1)
+    ]
+
+    response = client.post("/users/1/recipes/bulk", params={"progress": "true"}, json=recipes)
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [(p["imported"], p["total"]) for p in lines] == [
+        (RECIPE_IMPORT_CHUNK_SIZE, len(recipes)), (len(recipes), len(recipes)),
+    ]
+
+    response = client.post("/users/1/recipes/bulk", json=recipes[:3])
+    assert response.json()["message"] == "3 recipes imported"
+    assert len(db.lookup("recipe_ingredients", "name", "Tomate")) == len(recipes) + 3
+
+
+def test_failed_bulk_import_is_reported_with_committed_ids(client, db, monkeypatch):
+    """
+    Scheitert ein späterer Chunk, nennt die Antwort die bereits gespeicherten
+    Rezepte, statt nur mit 500 abzubrechen; im Stream steht eine Fehlerzeile.
+    """
+    import_chunk = RecipeRepository.import_recipes
+    calls = []
+
+    async def fail_second_chunk(self, user_id, payloads):
+        calls.append(len(payloads))
+        if len(calls) % 2 == 0:
+            raise RuntimeError("connection reset")
+        return await import_chunk(self, user_id, payloads)
+
+    monkeypatch.setattr(RecipeRepository, "import_recipes", fail_second_chunk)
+    recipes = [{"title": f"Rezept {i}", "ingredients": []} for i in range(RECIPE_IMPORT_CHUNK_SIZE + 1)]
+
+    response = client.post("/users/1/recipes/bulk", json=recipes)
+    assert response.status_code == 500
+    body = response.json()
+    assert (body["imported"], body["total"]) == (RECIPE_IMPORT_CHUNK_SIZE, len(recipes))
+    assert body["recipe_ids"] == [r["id"] for r in db.tables["recipes"]]
+    assert "connection reset" in body["error"]
+
+    response = client.post("/users/1/recipes/bulk", params={"progress": "true"}, json=recipes)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["imported"] == RECIPE_IMPORT_CHUNK_SIZE
+    assert lines[-1]["imported"] == RECIPE_IMPORT_CHUNK_SIZE
+    assert "connection reset" in lines[-1]["error"]
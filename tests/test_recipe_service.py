@@ -0,0 +1,358 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.cache import LRUCache
+from app.core.config import POSTGREST_MAX_ROWS
+from app.db.memory import InMemoryClient
+from app.repositories.food import FoodRepository
+from app.models.schemas import FoodItemConsume, FoodItemCreate, RecipeCreate
+from app.repositories.recipes import RecipeRepository
+from app.services.food_service import FoodService
+from app.services.data_version import DataVersions
+from app.services.user_index import UserIndexRegistry
+from app.services.recipe_service import RecipeImportError, RecipeService
+
+
+def make_service(client, indexes=None, cache=None):
+    return RecipeService(
+        RecipeRepository(client),
+        FoodRepository(client),
+        indexes if indexes is not None else UserIndexRegistry(DataVersions()),
+        cache if cache is not None else LRUCache(maxsize=100),
+    )
+
+
+def add_recipe(client, user_id, title, ingredient_names):
+    recipe = client.insert_rows("recipes", {"user_id": user_id, "title": title, "description": ""})[0]
+    client.insert_rows("recipe_ingredients", [
+        {"recipe_id": recipe["id"], "name": n, "name_norm": n.lower(), "quantity": "1", "unit": "stk"}
+        for n in ingredient_names
+    ])
+    return recipe
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_suggestions_use_constant_round_trips():
+    """
+    Unabhängig von der Anzahl der Rezepte: ein Request für den Vorrat,
+    ein Request für Rezepte inkl. Zutaten.
+    """
+    client = InMemoryClient()
+    client.insert_rows("food_stock", {
+        "user_id": 1, "name": "Tomate", "name_norm": "tomate",
+        "quantity": 3, "unit": "stk", "expiration_date": str(date.today()),
+    })
+    for i in range(25):
+        add_recipe(client, 1, f"Rezept {i}", ["Tomate", "Zwiebel"])
+    add_recipe(client, 1, "Tomatensalat", ["Tomate"])
+    add_recipe(client, 2, "Fremdes Rezept", ["Tomate"])
+
+    result = run(make_service(client).compute_recipe_suggestions(user_id=1))
+
+    assert client.round_trips == 2
+    suggestions = result["suggestions"]
+    assert len(suggestions) == 26
+    salad = next(s for s in suggestions if s["title"] == "Tomatensalat")
+    assert salad["ingredients"] == ["Tomate"]
+    # das machbare Rezept steht vorn
+    assert suggestions[0]["title"] == "Tomatensalat"
+    assert suggestions[1]["missing_ingredients"] == ["Zwiebel"]
+
+
+def test_index_reads_every_recipe_past_the_max_rows_cap():
+    client = InMemoryClient(max_rows=POSTGREST_MAX_ROWS)
+    for i in range(POSTGREST_MAX_ROWS + 5):
+        add_recipe(client, 1, f"Rezept {i}", ["Tomate"])
+    service = make_service(client)
+
+    assert len(run(service.compute_recipe_suggestions(1))["suggestions"]) == POSTGREST_MAX_ROWS + 5
+    # Lots und zwei Rezeptseiten
+    assert client.round_trips == 3
+
+
+def test_warm_index_follows_food_and_recipe_writes():
+    """
+    Nach dem ersten Aufruf kommen die Vorschläge aus dem Index, ohne DB-Zugriff,
+    und Schreibzugriffe halten den Index aktuell.
+    """
+    client = InMemoryClient()
+    indexes = UserIndexRegistry(DataVersions())
+    recipes = make_service(client, indexes)
+    food = FoodService(FoodRepository(client), indexes)
+    tomato = FoodItemCreate(name="Tomate", quantity=2, unit="stk", expiration_date=date(2030, 1, 1))
+
+    run(recipes.save_recipe(1, RecipeCreate(title="Tomatensalat", ingredients=[tomato])))
+    assert run(recipes.compute_recipe_suggestions(1))["suggestions"][0]["missing_ingredients"] == ["Tomate"]
+
+    client.round_trips = 0
+    _, rows = run(food.add_or_update_food_item(1, tomato))
+    assert run(recipes.compute_recipe_suggestions(1))["suggestions"][0]["ingredients"] == ["Tomate"]
+
+    run(food.consume_item(1, rows[0]["id"], FoodItemConsume(quantity=1)))
+    assert run(recipes.compute_recipe_suggestions(1))["suggestions"][0]["shortfall"] == [
+        {"name": "Tomate", "quantity": 1.0, "unit": "stk"}
+    ]
+
+    run(food.consume_item(1, rows[0]["id"], FoodItemConsume(quantity=1)))
+    assert run(recipes.compute_recipe_suggestions(1))["suggestions"][0]["missing_ingredients"] == ["Tomate"]
+
+    run(food.add_or_update_food_item(1, tomato))
+    run(food.delete_all_food(1))
+    assert run(recipes.compute_recipe_suggestions(1))["suggestions"][0]["missing_ingredients"] == ["Tomate"]
+
+    # nur die Schreibzugriffe selbst, keine Lesezugriffe für die Vorschläge
+    assert client.round_trips == 7
+
+
+def test_suggestion_cache_is_invalidated_by_writes():
+    client = InMemoryClient()
+    indexes = UserIndexRegistry(DataVersions())
+    cache = LRUCache(maxsize=100)
+    recipes = make_service(client, indexes, cache)
+    food = FoodService(FoodRepository(client), indexes)
+    tomato = FoodItemCreate(name="Tomate", quantity=2, unit="stk", expiration_date=date(2030, 1, 1))
+    run(recipes.save_recipe(1, RecipeCreate(title="Tomatensalat", ingredients=[tomato])))
+
+    first = run(recipes.compute_recipe_suggestions(1))
+    assert run(recipes.compute_recipe_suggestions(1)) is first
+    assert cache.stats()["hits"] == 1
+
+    run(food.add_or_update_food_item(1, tomato))
+    after_write = run(recipes.compute_recipe_suggestions(1))
+    assert after_write is not first
+    assert after_write["suggestions"][0]["ingredients"] == ["Tomate"]
+    assert cache.stats()["misses"] == 2
+
+
+def test_feasibility_sums_lots_and_converts_units():
+    """
+    Mengen werden über alle Lots summiert und in Basiseinheiten verglichen;
+    Fehlmengen stehen in der Einheit des Rezepts.
+    """
+    client = InMemoryClient()
+    client.insert_rows("food_stock", [
+        {"user_id": 1, "name": name, "name_norm": name.lower(), "quantity": qty, "unit": unit, "expiration_date": None}
+        for name, qty, unit in (
+            ("Nudeln", 500, "g"), ("Nudeln", 0.3, "kg"), ("Milch", 250, "ml"), ("Salz", 1, "kg"), ("Eier", 2, "Stk"),
+        )
+    ])
+
+    def recipe(title, ingredients):
+        row = client.insert_rows("recipes", {"user_id": 1, "title": title, "description": ""})[0]
+        client.insert_rows("recipe_ingredients", [
+            {"recipe_id": row["id"], "name": n, "name_norm": n.lower(), "quantity": q, "unit": u}
+            for n, q, u in ingredients
+        ])
+
+    recipe("Pasta", [("Nudeln", "0.8", "kg"), ("Salz", "1 Prise", None)])
+    recipe("Pfannkuchen", [("Milch", "1", "l"), ("Eier", "3", "pcs"), ("Mehl", "200", "g")])
+    recipe("Riesenpasta", [("Nudeln", "400", "g"), ("Nudeln", "500", "g")])
+
+    by_title = {s["title"]: s for s in run(make_service(client).compute_recipe_suggestions(1))["suggestions"]}
+
+    assert by_title["Pasta"]["ingredients"] == ["Nudeln", "Salz"]
+    assert by_title["Pfannkuchen"]["missing_ingredients"] == ["Milch", "Eier", "Mehl"]
+    assert by_title["Pfannkuchen"]["shortfall"] == [
+        {"name": "Milch", "quantity": 0.75, "unit": "l"},
+        {"name": "Eier", "quantity": 1.0, "unit": "pcs"},
+        {"name": "Mehl", "quantity": 200.0, "unit": "g"},
+    ]
+    assert by_title["Riesenpasta"]["shortfall"] == [{"name": "Nudeln", "quantity": 100.0, "unit": "g"}]
+
+
+def test_suggestions_rank_recipes_using_soon_expiring_stock_first():
+    """
+    Rezepte, die bald ablaufende Vorräte aufbrauchen, stehen vorn; fehlende
+    Zutaten kosten Punkte. ``limit`` liefert nur die besten k.
+    """
+    today = date.today()
+    client = InMemoryClient()
+    client.insert_rows("food_stock", [
+        {
+            "user_id": 1, "name": name, "name_norm": name.lower(), "quantity": 1, "unit": "stk",
+            "expiration_date": str(today + timedelta(days=days)),
+        }
+        for name, days in (("Spinat", 1), ("Reis", 200), ("Nudeln", 30))
+    ])
+    add_recipe(client, 1, "Reispfanne", ["Reis"])
+    add_recipe(client, 1, "Spinatauflauf", ["Spinat", "Käse"])
+    add_recipe(client, 1, "Spinatreis", ["Spinat", "Reis"])
+    add_recipe(client, 1, "Nudeln pur", ["Nudeln"])
+    service = make_service(client)
+
+    ranked = run(service.compute_recipe_suggestions(1))["suggestions"]
+    assert [s["title"] for s in ranked] == ["Spinatreis", "Nudeln pur", "Reispfanne", "Spinatauflauf"]
+    assert ranked[0]["score"] > ranked[1]["score"] > ranked[2]["score"] > 0 > ranked[3]["score"]
+
+    top = run(service.compute_recipe_suggestions(1, limit=2))["suggestions"]
+    assert [s["title"] for s in top] == ["Spinatreis", "Nudeln pur"]
+
+
+def test_shopping_list_aggregates_shortfall_across_recipes():
+    """
+    Bedarf mehrerer Rezepte wird je Zutat und Basiseinheit summiert und der
+    Vorrat nur einmal abgezogen; die Anzahl Requests ist konstant.
+    """
+    client = InMemoryClient()
+    client.insert_rows("food_stock", [
+        {"user_id": 1, "name": name, "name_norm": name.lower(), "quantity": qty, "unit": unit, "expiration_date": None}
+        for name, qty, unit in (("Nudeln", 0.5, "kg"), ("Tomate", 2, "stk"), ("Salz", 1, "kg"))
+    ])
+    ids = []
+    for title, ingredients in (
+        ("Pasta", [("Nudeln", "400", "g"), ("Tomate", "2", "stk"), ("Salz", "1 Prise", None)]),
+        ("Nudelsalat", [("Nudeln", "0.3", "kg"), ("Tomate", "3", "pcs"), ("Basilikum", None, None)]),
+        ("Suppe", [("Lauch", "1", "stk")]),
+    ):
+        row = client.insert_rows("recipes", {"user_id": 1, "title": title, "description": ""})[0]
+        client.insert_rows("recipe_ingredients", [
+            {"recipe_id": row["id"], "name": n, "name_norm": n.lower(), "quantity": q, "unit": u}
+            for n, q, u in ingredients
+        ])
+        ids.append(row["id"])
+    service = make_service(client)
+
+    result = run(service.shopping_list(1, ids[:2] + ids[:1]))
+
+    assert client.round_trips == 2
+    assert result["items"] == [
+        {"name": "Basilikum", "name_norm": "basilikum", "quantity": None, "unit": None, "recipes": ["Nudelsalat"]},
+        {"name": "Nudeln", "name_norm": "nudeln", "quantity": 200.0, "unit": "g", "recipes": ["Pasta", "Nudelsalat"]},
+        {"name": "Tomate", "name_norm": "tomate", "quantity": 3.0, "unit": "pcs", "recipes": ["Pasta", "Nudelsalat"]},
+    ]
+
+    with pytest.raises(HTTPException) as exc:
+        run(service.shopping_list(1, [ids[2], 999]))
+    assert exc.value.status_code == 404
+    assert exc.value.detail == "Recipes not found: 999"
+
+
+def test_shopping_list_rebuilds_a_stale_index_before_404():
+    """Ein am Index vorbei gespeichertes Rezept wird nach einem Neuaufbau gefunden."""
+    client = InMemoryClient()
+    service = make_service(client)
+    run(service.compute_recipe_suggestions(1))
+    recipe_id = add_recipe(client, 1, "Nachzügler", ["Tomate"])["id"]
+
+    result = run(service.shopping_list(1, [recipe_id]))
+
+    assert [item["name"] for item in result["items"]] == ["Tomate"]
+
+
+def test_bulk_import_writes_each_chunk_in_one_round_trip():
+    client = InMemoryClient()
+    payloads = [
+        RecipeCreate(title=f"Rezept {i}", ingredients=[
+            FoodItemCreate(name=n, quantity=i + 1, unit="stk", expiration_date=date.today())
+            for n in ("Tomate", "Zwiebel")[: i % 2 + 1]
+        ])
+        for i in range(5)
+    ]
+
+    async def scenario():
+        return [p async for p in make_service(client).import_recipes(1, payloads, chunk_size=2)]
+
+    progress = run(scenario())
+
+    # 3 Chunks à ein RPC, unabhängig von der Zahl der Zutaten
+    assert client.round_trips == 3
+    assert [(p["imported"], p["total"]) for p in progress] == [(2, 5), (4, 5), (5, 5)]
+    recipe_ids = [rid for p in progress for rid in p["recipe_ids"]]
+    rows = run(RecipeRepository(client).get_recipes_with_ingredients(1))
+    by_id = {r["id"]: r for r in rows}
+    assert [by_id[rid]["title"] for rid in recipe_ids] == [p.title for p in payloads]
+    assert [i["name"] for i in by_id[recipe_ids[3]]["recipe_ingredients"]] == ["Tomate", "Zwiebel"]
+    assert by_id[recipe_ids[4]]["recipe_ingredients"][0]["quantity"] == 5
+
+
+class FailingRecipeRepository(RecipeRepository):
+    """Lässt ab dem ``fail_on``-ten Import-Aufruf jeden Chunk scheitern."""
+
+    def __init__(self, client, fail_on):
+        super().__init__(client)
+        self.calls = 0
+        self.fail_on = fail_on
+
+    async def import_recipes(self, user_id, payloads):
+        self.calls += 1
+        if self.calls >= self.fail_on:
+            raise RuntimeError("connection reset")
+        return await super().import_recipes(user_id, payloads)
+
+
+def recipes(n):
+    return [RecipeCreate(title=f"Rezept {i}", ingredients=[]) for i in range(n)]
+
+
+def test_failed_import_chunk_reports_what_was_committed():
+    client = InMemoryClient()
+    indexes = UserIndexRegistry(DataVersions())
+    service = RecipeService(FailingRecipeRepository(client, fail_on=2), FoodRepository(client), indexes, LRUCache(maxsize=100))
+    run(service.compute_recipe_suggestions(1))  # Index ist warm
+
+    async def scenario():
+        return [p async for p in service.import_recipes(1, recipes(5), chunk_size=2)]
+
+    with pytest.raises(RecipeImportError) as exc:
+        run(scenario())
+
+    committed = [r["id"] for r in client.tables["recipes"]]
+    assert (exc.value.imported, exc.value.total, exc.value.recipe_ids) == (2, 5, committed)
+    assert "connection reset" in str(exc.value)
+    # ob der fehlgeschlagene Chunk geschrieben wurde, ist unklar: Index neu aufbauen
+    assert indexes.get(1) is None
+
+
+def test_detached_import_finishes_without_a_reader_and_reports_errors():
+    client = InMemoryClient()
+
+    async def scenario():
+        queue = make_service(client).import_recipes_detached(1, recipes(5), chunk_size=2)
+        first = await queue.get()
+        # der Client ist weg und liest nichts mehr; der Import läuft weiter
+        while len(client.tables["recipes"]) < 5:
+            await asyncio.sleep(0)
+        return first
+
+    assert run(scenario())["imported"] == 2
+    assert len(client.tables["recipes"]) == 5
+
+    failing = RecipeService(
+        FailingRecipeRepository(client, fail_on=2), FoodRepository(client),
+        UserIndexRegistry(DataVersions()), LRUCache(maxsize=100),
+    )
+
+    async def drain():
+        queue = failing.import_recipes_detached(1, recipes(5), chunk_size=2)
+        lines = []
+        while (line := await queue.get()) is not None:
+            lines.append(line)
+        return lines
+
+    lines = run(drain())
+    assert lines[0]["imported"] == 2
+    assert lines[-1]["imported"] == 2 and lines[-1]["total"] == 5
+    assert "connection reset" in lines[-1]["error"]
+
+
+def test_save_recipe_is_one_rpc_returning_the_recipe_with_ingredients():
+    client = InMemoryClient()
+    ingredients = [
+        FoodItemCreate(name=n, quantity=q, unit="g", expiration_date=date.today()) for n, q in (("Mehl", 200), ("Zucker", 50))
+    ]
+
+    result = run(make_service(client).save_recipe(1, RecipeCreate(title="Kuchen", ingredients=ingredients)))
+
+    assert client.round_trips == 1
+    recipe = result["recipe"]
+    assert recipe == {"id": recipe["id"], "user_id": 1, "title": "Kuchen", "description": ""}
+    assert [(i["recipe_id"], i["name"], i["name_norm"], i["quantity"]) for i in result["ingredients"]] == [
+        (recipe["id"], "Mehl", "mehl", 200.0), (recipe["id"], "Zucker", "zucker", 50.0),
+    ]
+    assert len(client.lookup("recipe_ingredients", "recipe_id", recipe["id"])) == 2
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.cache import LRUCache
+from app.core.security import create_access_token, resolve_user_id
+
+
+def test_resolve_user_id_caches_verified_tokens():
+    cache = LRUCache(maxsize=10)
+    token = create_access_token({"user_id": 42})
+
+    assert resolve_user_id(token, cache=cache) == 42
+    assert resolve_user_id(token, cache=cache) == 42
+
+    stats = cache.stats()
+    assert stats["size"] == 1
+    assert stats["hits"] == 1
+
+
+def test_resolve_user_id_does_not_cache_invalid_or_expired_tokens():
+    cache = LRUCache(maxsize=10)
+    expired = create_access_token({"user_id": 1}, expires_delta=timedelta(seconds=-1))
+
+    for token in ("invalid.token.value", expired):
+        with pytest.raises(HTTPException) as exc:
+            resolve_user_id(token, cache=cache)
+        assert exc.value.status_code == 401
+
+    assert len(cache) == 0
@@ -0,0 +1,49 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.core import config
+from main import create_app
+
+
+def test_importing_the_app_does_not_load_the_supabase_stack_or_numpy():
+    # frischer Prozess, damit andere Tests sys.modules nicht verfälschen
+    proc = subprocess.run(
+        [
+            sys.executable, "-c",
+            "import sys, main; print(sorted({'supabase', 'httpx', 'numpy', 'dotenv'} & set(sys.modules)))",
+        ],
+        env={**os.environ, "SUPABASE_BACKEND": "memory"}, capture_output=True, text=True, check=True,
+    )
+
+    assert proc.stdout.strip() == "[]"
+
+
+def test_missing_credentials_fail_in_the_lifespan_not_at_import(monkeypatch):
+    monkeypatch.setenv("SUPABASE_BACKEND", "supabase")
+    monkeypatch.setenv("SUPABASE_URL", "")  # gesetzt, damit .env es nicht auffüllt
+    monkeypatch.setattr(config, "_settings", None)
+    app = create_app()
+
+    async def start():
+        async with app.router.lifespan_context(app):
+            pass
+
+    with pytest.raises(RuntimeError, match="SUPABASE_URL"):
+        asyncio.run(start())
+
+
+def test_factory_builds_only_the_served_app():
+    # uvicorn main:create_app --factory darf kein zweites, ungenutztes App-Objekt erzeugen
+    proc = subprocess.run(
+        [
+            sys.executable, "-c",
+            "import main; main.create_app(); print('app' in vars(main)); main.app; print('app' in vars(main))",
+        ],
+        env={**os.environ, "SUPABASE_BACKEND": "memory"}, capture_output=True, text=True, check=True,
+    )
+
+    assert proc.stdout.split() == ["False", "True"]
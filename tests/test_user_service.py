@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import BCRYPT_ROUNDS
+from app.core.security import PasswordHasher, hash_password, password_needs_rehash
+from app.db.memory import InMemoryClient
+from app.models.schemas import UserLogin
+from app.repositories.users import UserRepository
+from app.services.user_service import UserService
+
+
+def test_password_needs_rehash_compares_cost_factor():
+    assert password_needs_rehash(hash_password("pw", rounds=4), rounds=5) is True
+    assert password_needs_rehash(hash_password("pw", rounds=4), rounds=4) is False
+    assert password_needs_rehash("kein-bcrypt-hash") is True
+
+
+def test_login_upgrades_hash_with_outdated_cost():
+    """
+    Ein Hash mit anderem Cost-Faktor wird beim erfolgreichen Login ersetzt.
+    """
+    client = InMemoryClient()
+    old_hash = hash_password("secret", rounds=4)
+    client.insert_rows("users", {"username": "alice", "email": "a@example.com", "password_hash": old_hash})
+
+    token = asyncio.run(UserService(UserRepository(client)).login(UserLogin(username="alice", password="secret")))
+
+    assert token
+    new_hash = client.tables["users"][0]["password_hash"]
+    assert new_hash != old_hash
+    assert new_hash.split("$")[2] == f"{BCRYPT_ROUNDS:02d}"
+
+
+def test_password_hasher_rejects_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, max_pending=0)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(hasher.verify("pw", hash_password("pw", rounds=4)))
+
+    assert exc.value.status_code == 503
+    assert hasher.stats()["rejected"] == 1